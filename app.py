@@ -1,7 +1,44 @@
 # This is the entry point for HuggingFace Spaces
-# It simply imports and runs the main Streamlit app
-import subprocess
+# It runs the main Streamlit app in this process, rather than forking a new
+# interpreter that has to import streamlit all over again
+import os
 import sys
 
+from streamlit.web import bootstrap
+
+FLAG_OPTIONS = {"server_headless": True, "server_port": 7860}
+
+
+def preload() -> None:
+    """Import what the first tool call needs and warm the database.
+
+    Runs while the Space is still booting, so the first request finds the
+    bytecode cache populated, the database downloaded and its pages in the
+    OS page cache.
+    """
+    src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+
+    try:
+        import sqlite3
+        import mcp.client.session
+        import mcp.client.stdio
+        import mcp_postal_geocoder.server.database.queries
+        from mcp_postal_geocoder.server.database.connection import db_connection
+
+        db_connection.connect()
+        db_connection.warmup()
+        
+        # Queries run in the MCP server subprocess; this process only needed
+        # the pages read into the OS page cache, not the open connections
+        db_connection.close()
+    except Exception as e:
+        # The app still works without the preload, just with a slower first call
+        print(f"Preload failed: {e}")
+
+
 if __name__ == "__main__":
-    subprocess.run([sys.executable, "-m", "streamlit", "run", "streamlit_app.py", "--server.headless", "true", "--server.port", "7860"])
\ No newline at end of file
+    preload()
+    bootstrap.load_config_options(flag_options=FLAG_OPTIONS)
+    bootstrap.run("streamlit_app.py", False, [], FLAG_OPTIONS)
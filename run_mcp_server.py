@@ -10,6 +10,7 @@ the main server directly.
 import sys
 import os
 import logging
+import runpy
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -40,10 +41,9 @@ def main():
             sys.exit(1)
         
         logger.info("Executing MCP server")
-        with open(server_file, 'r') as f:
-            server_code = f.read()
-        
-        exec(server_code, {'__name__': '__main__', '__file__': server_file})
+        # run_module goes through the standard import loader, so the compiled
+        # bytecode is cached in __pycache__ and reused on warm starts
+        runpy.run_module("mcp_postal_geocoder.server.mcp_server", run_name="__main__", alter_sys=True)
         
     except Exception as e:
         logger.error(f"Failed to execute MCP server: {e}")
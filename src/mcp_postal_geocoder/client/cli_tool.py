@@ -2,15 +2,21 @@
 
 import argparse
 import asyncio
-import json
+import functools
+import shlex
 import sys
 import platform
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Tuple
 
+import orjson
 from mcp.client.session import ClientSession
 from mcp.client.stdio import stdio_client, StdioServerParameters
 
+# Upper bound on tool calls in flight on one session
+MAX_CONCURRENT_CALLS = 8
 
+
+@functools.cache
 def get_python_command() -> str:
     """Get the appropriate Python command for the current platform."""
     if platform.system() == "Windows":
@@ -19,17 +25,36 @@ def get_python_command() -> str:
         return "python3"
 
 
+def format_response(text: str) -> str:
+    """Pretty-print a JSON tool response, or return non-JSON text as is."""
+    try:
+        return orjson.dumps(orjson.loads(text), option=orjson.OPT_INDENT_2).decode()
+    except orjson.JSONDecodeError:
+        # e.g. FastMCP's plain-text error for invalid tool arguments
+        return text
+
+
+async def call_tools_bounded(
+    session: ClientSession,
+    calls: List[Tuple[str, Dict[str, Any]]],
+    limit: int = MAX_CONCURRENT_CALLS
+) -> List[Any]:
+    """Run tool calls concurrently, at most ``limit`` in flight at once."""
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def call(tool_name: str, tool_args: Dict[str, Any]) -> Any:
+        async with semaphore:
+            return await session.call_tool(tool_name, tool_args)
+    
+    return await asyncio.gather(*(call(name, args) for name, args in calls))
+
+
 async def test_mcp_server() -> None:
     """Test the MCP server functionality."""
     
-    # Start the MCP server process
-    server_params = StdioServerParameters(
-        command=get_python_command(),
-        args=["-m", "mcp_postal_geocoder.server.mcp_server"]
-    )
-    
     try:
-        async with stdio_client(server_params) as (read, write):
+        # Start the MCP server process
+        async with stdio_client(SERVER_PARAMS) as (read, write):
             async with ClientSession(read, write) as session:
                 # Initialize the session
                 await session.initialize()
@@ -42,45 +67,35 @@ async def test_mcp_server() -> None:
                 
                 print("\n" + "="*50)
                 
-                # Test postal_code_search
-                print("\n1. Testing postal_code_search with ZIP 73717:")
-                result = await session.call_tool("postal_code_search", {"postal_code": "73717"})
-                if result.content:
-                    response = json.loads(result.content[0].text)
-                    print(json.dumps(response, indent=2))
+                # The tools are independent and read-only, so issue them
+                # concurrently and print the results in order
+                test_calls = [
+                    ("1. Testing postal_code_search with ZIP 73717:",
+                     "postal_code_search", {"postal_code": "73717"}),
+                    ("2. Testing geocode_postal with ZIP 90210:",
+                     "geocode_postal", {"postalCode": "90210"}),
+                    ("3. Testing reverse_geocode near Seattle:",
+                     "reverse_geocode", {
+                         "latitude": 47.606,
+                         "longitude": -122.332,
+                         "radius": 5.0,
+                         "maxResults": 3
+                     }),
+                    ("4. Testing validate_postal with ZIP 12345:",
+                     "validate_postal", {"postalCode": "12345"}),
+                    ("5. Testing postal_stats:",
+                     "postal_stats", {}),
+                ]
                 
-                # Test geocode_postal
-                print("\n2. Testing geocode_postal with ZIP 90210:")
-                result = await session.call_tool("geocode_postal", {"postalCode": "90210"})
-                if result.content:
-                    response = json.loads(result.content[0].text)
-                    print(json.dumps(response, indent=2))
+                results = await call_tools_bounded(
+                    session,
+                    [(tool_name, tool_args) for _, tool_name, tool_args in test_calls]
+                )
                 
-                # Test reverse_geocode
-                print("\n3. Testing reverse_geocode near Seattle:")
-                result = await session.call_tool("reverse_geocode", {
-                    "latitude": 47.606,
-                    "longitude": -122.332,
-                    "radius": 5.0,
-                    "maxResults": 3
-                })
-                if result.content:
-                    response = json.loads(result.content[0].text)
-                    print(json.dumps(response, indent=2))
-                
-                # Test validate_postal
-                print("\n4. Testing validate_postal with ZIP 12345:")
-                result = await session.call_tool("validate_postal", {"postalCode": "12345"})
-                if result.content:
-                    response = json.loads(result.content[0].text)
-                    print(json.dumps(response, indent=2))
-                
-                # Test postal_stats
-                print("\n5. Testing postal_stats:")
-                result = await session.call_tool("postal_stats", {})
-                if result.content:
-                    response = json.loads(result.content[0].text)
-                    print(json.dumps(response, indent=2))
+                for (title, _, _), result in zip(test_calls, results):
+                    print(f"\n{title}")
+                    if result.content:
+                        print(format_response(result.content[0].text))
     
     except Exception as e:
         print(f"Error testing MCP server: {e}")
@@ -88,62 +103,129 @@ async def test_mcp_server() -> None:
         raise
 
 
-async def run_cli_command(args) -> None:
+def _with_style(tool_args: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Add the response style to tool arguments when it is not the default."""
+    if args.style != "MEDIUM":
+        tool_args["style"] = args.style
+    return tool_args
+
+
+def _build_search_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build postal_code_search arguments."""
+    if args.postal_code:
+        return _with_style({"postal_code": args.postal_code}, args)
+    return _with_style({"postal_code": args.prefix, "prefix": True, "maxResults": args.max_rows}, args)
+
+
+def _build_geocode_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build geocode_postal arguments."""
+    return _with_style({"postalCode": args.postal_code}, args)
+
+
+def _build_reverse_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build reverse_geocode arguments."""
+    return _with_style({
+        "latitude": args.latitude,
+        "longitude": args.longitude,
+        "radius": args.radius,
+        "maxResults": args.max_results
+    }, args)
+
+
+def _build_validate_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build validate_postal arguments."""
+    return {"postalCode": args.postal_code}
+
+
+def _build_stats_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build postal_stats arguments."""
+    return {}
+
+
+# CLI command -> (tool argument builder, MCP tool name)
+DISPATCH: Dict[str, Tuple[Callable[[argparse.Namespace], Dict[str, Any]], str]] = {
+    "search": (_build_search_args, "postal_code_search"),
+    "geocode": (_build_geocode_args, "geocode_postal"),
+    "reverse": (_build_reverse_args, "reverse_geocode"),
+    "validate": (_build_validate_args, "validate_postal"),
+    "stats": (_build_stats_args, "postal_stats"),
+}
+
+
+async def execute_command(session: ClientSession, args: argparse.Namespace) -> None:
+    """Run a single CLI command against an open MCP session."""
+    if args.command not in DISPATCH:
+        print(f"Unknown command: {args.command}")
+        return
+    
+    build_args, tool_name = DISPATCH[args.command]
+    result = await session.call_tool(tool_name, build_args(args))
+    
+    # Print result
+    if result.isError:
+        print(f"Error: {result.content[0].text if result.content else 'tool call failed'}")
+    elif result.content:
+        print(format_response(result.content[0].text))
+    else:
+        print("No response received")
+
+
+async def run_repl(session: ClientSession) -> None:
+    """Read commands from stdin and run them over one persistent MCP session."""
+    print("Interactive mode: enter commands such as 'geocode 90210' ('quit' to exit)")
+    
+    while True:
+        try:
+            line = await asyncio.to_thread(input, "postal> ")
+        except EOFError:
+            break
+        
+        line = line.strip()
+        if not line:
+            continue
+        if line in ("quit", "exit"):
+            break
+        
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            # e.g. an unclosed quote
+            print(f"Error: {e}")
+            continue
+        
+        try:
+            args = PARSER.parse_args(words)
+        except SystemExit:
+            # argparse has already printed the usage error
+            continue
+        
+        if args.command in ("repl", "test"):
+            print(f"'{args.command}' is not available in interactive mode")
+            continue
+        
+        try:
+            await execute_command(session, args)
+        except Exception as e:
+            # One failed command should not end the session
+            print(f"Error: {e}")
+
+
+async def run_cli_command(args: argparse.Namespace) -> None:
     """Run CLI command using MCP client."""
     
-    server_params = StdioServerParameters(
-        command=get_python_command(),
-        args=["-m", "mcp_postal_geocoder.server.mcp_server"]
-    )
+    if args.command == "test":
+        await test_mcp_server()
+        return
     
     try:
-        async with stdio_client(server_params) as (read, write):
+        async with stdio_client(SERVER_PARAMS) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
                 
-                if args.command == "search":
-                    tool_args = {"postal_code": args.postal_code or args.prefix}
-                    if args.style != "MEDIUM":
-                        tool_args["style"] = args.style
-                    result = await session.call_tool("postal_code_search", tool_args)
-                    
-                elif args.command == "geocode":
-                    tool_args = {"postalCode": args.postal_code}
-                    if args.style != "MEDIUM":
-                        tool_args["style"] = args.style
-                    result = await session.call_tool("geocode_postal", tool_args)
-                    
-                elif args.command == "reverse":
-                    tool_args = {
-                        "latitude": args.latitude,
-                        "longitude": args.longitude,
-                        "radius": args.radius,
-                        "maxResults": args.max_results
-                    }
-                    if args.style != "MEDIUM":
-                        tool_args["style"] = args.style
-                    result = await session.call_tool("reverse_geocode", tool_args)
-                    
-                elif args.command == "validate":
-                    result = await session.call_tool("validate_postal", {"postalCode": args.postal_code})
-                    
-                elif args.command == "stats":
-                    result = await session.call_tool("postal_stats", {})
-                    
-                elif args.command == "test":
-                    await test_mcp_server()
-                    return
-                
+                if args.command == "repl":
+                    await run_repl(session)
                 else:
-                    print(f"Unknown command: {args.command}")
-                    return
-                
-                # Print result
-                if result.content:
-                    response = json.loads(result.content[0].text)
-                    print(json.dumps(response, indent=2))
-                else:
-                    print("No response received")
+                    await execute_command(session, args)
     
     except Exception as e:
         print(f"Error running CLI command: {e}")
@@ -151,8 +233,8 @@ async def run_cli_command(args) -> None:
         raise
 
 
-def main() -> None:
-    """CLI entry point for postal geocoding operations."""
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all CLI commands."""
     parser = argparse.ArgumentParser(description="Postal Code Geocoding CLI")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
@@ -189,10 +271,28 @@ def main() -> None:
     # Stats command
     subparsers.add_parser("stats", help="Database statistics")
     
-    args = parser.parse_args()
+    # Interactive command
+    subparsers.add_parser("repl", help="Run commands interactively over one server session")
+    
+    return parser
+
+
+# Neither depends on the command being run, so both are built once at
+# import time and reused by every command (and every line of a REPL session)
+PARSER = build_parser()
+
+SERVER_PARAMS = StdioServerParameters(
+    command=get_python_command(),
+    args=["-m", "mcp_postal_geocoder.server.mcp_server"]
+)
+
+
+def main() -> None:
+    """CLI entry point for postal geocoding operations."""
+    args = PARSER.parse_args()
     
     if not args.command:
-        parser.print_help()
+        PARSER.print_help()
         sys.exit(1)
     
     # Run the async CLI command
@@ -0,0 +1,226 @@
+"""Build-time indexes and statistics for the postal code database.
+
+Run once after the database is downloaded, or ahead of time to ship a
+pre-indexed file:
+
+    python -m mcp_postal_geocoder.server.database.build [path/to/postal.db]
+
+Every step is idempotent, so the server also runs them on first connect.
+Stop any running server first: its connections hold the file's lock, so
+the build cannot write to it.
+"""
+
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Union
+
+from .geohash import geohash32
+
+logger = logging.getLogger(__name__)
+
+
+def describe_error(e: sqlite3.Error) -> str:
+    """Explain a failed build step, naming lock conflicts explicitly."""
+    # "database is locked" (SQLITE_BUSY) or "database table is locked"
+    if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+        return f"{e}; another process (e.g. a running server) holds the database, stop it and rebuild"
+    return str(e)
+
+
+def has_table(conn: sqlite3.Connection, name: str) -> bool:
+    """Check whether a table (or virtual table) exists."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def has_index(conn: sqlite3.Connection, name: str) -> bool:
+    """Check whether an index exists."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def count_located_rows(conn: sqlite3.Connection) -> int:
+    """Count the postal codes that have coordinates."""
+    return conn.execute("""
+        SELECT COUNT(*) FROM postal_codes
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """).fetchone()[0]
+
+
+def build_spatial_index(conn: sqlite3.Connection) -> bool:
+    """Build the R*Tree index over postal code coordinates if missing.
+
+    An index that does not hold every located postal code (e.g. left by
+    an interrupted build) is rebuilt. Returns whether the index is
+    available.
+    """
+    exists = has_table(conn, "postal_rtree")
+    if exists:
+        try:
+            # The table may exist in a file built elsewhere while this
+            # SQLite lacks the R*Tree module
+            indexed = conn.execute("SELECT COUNT(*) FROM postal_rtree").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Spatial index unavailable, using geohash scan: {describe_error(e)}")
+            return False
+
+        expected = count_located_rows(conn)
+        if indexed == expected:
+            return True
+        logger.warning(f"Spatial index incomplete ({indexed} of {expected} rows), rebuilding")
+
+    try:
+        # sqlite3 does not open a transaction for DDL on its own; without
+        # BEGIN the CREATE would commit before the rows are inserted
+        conn.execute("BEGIN")
+        if exists:
+            conn.execute("DROP TABLE postal_rtree")
+        # Each postal code is stored as a degenerate (point) box
+        conn.execute(
+            "CREATE VIRTUAL TABLE postal_rtree USING rtree(id, minLat, maxLat, minLng, maxLng)"
+        )
+        conn.execute("""
+            INSERT INTO postal_rtree (id, minLat, maxLat, minLng, maxLng)
+            SELECT rowid, latitude, latitude, longitude, longitude
+            FROM postal_codes
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        """)
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        conn.rollback()
+        # SQLite built without R*Tree, a read-only database file, or one
+        # locked by a running server
+        logger.warning(f"Spatial index unavailable, using geohash scan: {describe_error(e)}")
+        return False
+
+
+def build_geohash_index(conn: sqlite3.Connection) -> bool:
+    """Add an indexed geohash32 column to postal_codes if missing.
+
+    This is the reverse geocoding index when R*Tree is unavailable. A column
+    with unfilled values or without its index (e.g. left by an interrupted
+    build) is filled in again. Returns whether the index is available.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(postal_codes)")}
+    has_column = "geohash32" in columns
+    if has_column and has_index(conn, "idx_postal_geohash"):
+        unfilled = conn.execute("""
+            SELECT 1 FROM postal_codes
+            WHERE geohash32 IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL
+            LIMIT 1
+        """).fetchone()
+        if unfilled is None:
+            return True
+        logger.warning("Geohash index incomplete, rebuilding")
+
+    try:
+        # One explicit transaction: sqlite3 would otherwise commit the
+        # ALTER on its own, before any value is filled in
+        conn.execute("BEGIN")
+        if not has_column:
+            conn.execute("ALTER TABLE postal_codes ADD COLUMN geohash32 INTEGER")
+        rows = conn.execute("""
+            SELECT rowid, latitude, longitude FROM postal_codes
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        """).fetchall()
+        conn.executemany(
+            "UPDATE postal_codes SET geohash32 = ? WHERE rowid = ?",
+            ((geohash32(lat, lng), rowid) for rowid, lat, lng in rows)
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_postal_geohash ON postal_codes(geohash32)")
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        conn.rollback()
+        # e.g. a read-only or locked database file; falls back to the bounding box scan
+        logger.warning(f"Geohash index unavailable, using bounding box scan: {describe_error(e)}")
+        return False
+
+
+def build_covering_index(conn: sqlite3.Connection) -> bool:
+    """Build an index holding every column the lookups select, if missing.
+
+    Exact and prefix lookups are then answered from the index B-tree alone,
+    without visiting the table. Returns whether the index was created.
+    """
+    if has_index(conn, "idx_postal_covering"):
+        return False
+
+    try:
+        with conn:
+            conn.execute("""
+                CREATE INDEX idx_postal_covering ON postal_codes(
+                    zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, city
+                )
+            """)
+        return True
+    except sqlite3.Error as e:
+        # e.g. a read-only or locked database file; lookups fall back to idx_zcta_lookup
+        logger.warning(f"Covering index unavailable: {describe_error(e)}")
+        return False
+
+
+def build_statistics(conn: sqlite3.Connection, force: bool = False) -> None:
+    """Collect planner statistics (sqlite_stat1) if the file has none.
+
+    Shipped with the database, they let the planner choose indexes from real
+    row counts instead of heuristics. ``force`` re-collects them, e.g. after
+    adding an index.
+    """
+    if force or not has_table(conn, "sqlite_stat1"):
+        try:
+            conn.execute("ANALYZE")
+            conn.commit()
+        except sqlite3.Error as e:
+            # e.g. a read-only or locked database file; the planner falls back to heuristics
+            logger.warning(f"Planner statistics unavailable: {describe_error(e)}")
+
+
+def build_indexes(conn: sqlite3.Connection) -> Dict[str, bool]:
+    """Run every build step on a writable connection.
+
+    Returns which reverse geocoding indexes ("spatial", "geohash") are
+    available.
+    """
+    available = {
+        "spatial": build_spatial_index(conn),
+        "geohash": build_geohash_index(conn),
+    }
+    created_index = build_covering_index(conn)
+
+    # Statistics go last so they cover every index
+    build_statistics(conn, force=created_index)
+    return available
+
+
+def build_database(db_path: Union[str, Path]) -> None:
+    """Open the database at ``db_path`` and build its indexes."""
+    conn = sqlite3.connect(db_path)
+    try:
+        build_indexes(conn)
+    finally:
+        conn.close()
+    logger.info(f"Indexes built: {db_path}")
+
+
+def main() -> None:
+    """Build indexes for the database given on the command line."""
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 1:
+        build_database(sys.argv[1])
+    else:
+        # Resolve (and download if needed) the default database
+        from .connection import db_connection
+        db_connection.connect()
+        db_connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,64 @@
 """Database connection management for postal code lookups."""
 
+import logging
+import queue
 import sqlite3
 import os
 import threading
-import requests
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .build import build_indexes
+
+# Never print here: the MCP server speaks its protocol over stdout
+logger = logging.getLogger(__name__)
+
+# Read size for streaming the database download
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Connections kept open; matches the server's database thread pool so a
+# worker never waits for one
+POOL_SIZE = 8
+
+# Put in the pool by close() to wake threads waiting in acquire()
+_POOL_CLOSED = object()
 
 
 class DatabaseConnection:
-    """Singleton database connection manager with connection pooling."""
+    """Pool of tuned, read-only connections to the postal database.
     
-    _instance: Optional['DatabaseConnection'] = None
-    _lock = threading.Lock()
+    Use the shared module-level ``db_connection`` instance and check a
+    connection out with ``acquire()``.
+    """
     
-    def __new__(cls) -> 'DatabaseConnection':
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
+    _prepared: Dict[str, str] = {}
+    _close_hooks: List[Callable[[], None]] = []
     
-    def __init__(self) -> None:
-        if hasattr(self, '_initialized'):
-            return
-            
-        self._initialized = True
-        self._db_path = self._get_database_path()
-        self._connection: Optional[sqlite3.Connection] = None
+    def __init__(self, pool_size: int = POOL_SIZE) -> None:
+        # Resolved (and downloaded if missing) on first connect, not import
+        self._db_path: Optional[Path] = None
+        # Idle connections; each is used by one thread at a time, and SQLite
+        # readers do not block each other
+        self._pool_size = pool_size
+        self._pool: "queue.SimpleQueue[object]" = queue.SimpleQueue()
+        self._connections: List[sqlite3.Connection] = []
         self._lock = threading.Lock()
+        self._migrated = False
+        self.has_spatial_index = False
+        self.has_geohash_index = False
     
     def _download_database(self, db_path: Path) -> None:
         """Download the postal code database from Hugging Face."""
+        # Only needed on first run, so keep it off the server's import path
+        import requests
+
         url = "https://huggingface.co/datasets/bott-wa/us-postal-geocoding-db/resolve/main/postal_census_complete.db"
         
-        print(f"Downloading postal code database from Hugging Face...")
-        print(f"URL: {url}")
-        print(f"Destination: {db_path}")
+        logger.info("Downloading postal code database from Hugging Face...")
+        logger.info(f"URL: {url}")
+        logger.info(f"Destination: {db_path}")
         
         # Ensure the directory exists
         db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -48,16 +70,28 @@ class DatabaseConnection:
         total_size = int(response.headers.get('content-length', 0))
         downloaded = 0
         
+        # Copy straight from the raw stream in large blocks and only report
+        # progress every 5% or once per second, instead of per 8KB chunk
+        response.raw.decode_content = True
+        last_report = time.monotonic()
+        last_progress = 0.0
+        
         with open(db_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0:
-                        progress = (downloaded / total_size) * 100
-                        print(f"\rDownload progress: {progress:.1f}%", end='', flush=True)
-        
-        print(f"\nDownload completed: {db_path}")
+            while True:
+                chunk = response.raw.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                downloaded += len(chunk)
+                if total_size > 0:
+                    progress = min(downloaded / total_size * 100, 100.0)
+                    now = time.monotonic()
+                    if progress - last_progress >= 5 or now - last_report >= 1:
+                        logger.info(f"Download progress: {progress:.1f}%")
+                        last_progress = progress
+                        last_report = now
+        
+        logger.info(f"Download completed: {db_path}")
 
     def _get_database_path(self) -> Path:
         """Get the path to the postal codes database."""
@@ -77,7 +111,7 @@ class DatabaseConnection:
             return Path(env_path)
         
         # If database doesn't exist, try to download it
-        print(f"Database not found at {db_path}")
+        logger.warning(f"Database not found at {db_path}")
         try:
             self._download_database(db_path)
             return db_path
@@ -89,39 +123,177 @@ class DatabaseConnection:
                 f"and place it at {db_path}, or set POSTAL_DB_PATH environment variable."
             )
     
-    def connect(self) -> sqlite3.Connection:
-        """Get or create database connection."""
-        if self._connection is None:
-            with self._lock:
-                if self._connection is None:
-                    self._connection = sqlite3.connect(
-                        self._db_path,
-                        check_same_thread=False
-                    )
-                    self._connection.row_factory = sqlite3.Row
-                    
-                    # Enable WAL mode for better concurrent access
-                    self._connection.execute("PRAGMA journal_mode = WAL")
-                    
-                    # Optimize for read performance
-                    self._connection.execute("PRAGMA temp_store = memory")
-                    self._connection.execute("PRAGMA mmap_size = 268435456")  # 256MB
-                    
-                    print(f"Connected to postal database: {self._db_path}")
-        
-        return self._connection
+    def connect(self) -> None:
+        """Open the database and fill the connection pool.
+        
+        Called once at startup; ``acquire()`` also calls it on first use.
+        """
+        with self._lock:
+            if not self._migrated:
+                self._db_path = self._get_database_path()
+                self._migrate()
+                self._migrated = True
+            
+            if self._connections:
+                return
+            
+            # Drop the marker left by a previous close()
+            self._drain_pool()
+            
+            # Opened up front so every connection has its PRAGMAs applied
+            # and its statements primed before the first request
+            for _ in range(self._pool_size):
+                conn = self._open_connection()
+                self._connections.append(conn)
+                self._pool.put(conn)
+            
+            logger.info(f"Connected to postal database: {self._db_path} ({self._pool_size} connections)")
     
-    def close(self) -> None:
-        """Close database connection."""
-        if self._connection:
+    @contextmanager
+    def acquire(self) -> Iterator[sqlite3.Connection]:
+        """Check a connection out of the pool for the duration of a block."""
+        if not self._connections:
+            self.connect()
+        
+        while True:
+            conn = self._pool.get()
+            if conn is not _POOL_CLOSED:
+                break
+            with self._lock:
+                closed = not self._connections
+                if closed:
+                    # Pass the marker on to the next waiting thread
+                    self._pool.put(conn)
+            if closed:
+                raise sqlite3.ProgrammingError("Database connection pool was closed")
+            # Reopened since the marker was queued; wait for a connection
+        
+        try:
+            yield conn
+        finally:
+            # Connections closed while checked out are not returned
             with self._lock:
-                if self._connection:
-                    self._connection.close()
-                    self._connection = None
-                    print("Database connection closed")
+                if conn in self._connections:
+                    self._pool.put(conn)
     
-    def get_connection(self) -> sqlite3.Connection:
-        """Get the current database connection."""
-        if self._connection is None:
-            return self.connect()
-        return self._connection
\ No newline at end of file
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a read-only, tuned connection to the postal database."""
+        # Pooled connections move between threads, one at a time. Autocommit
+        # mode, since reads never need a transaction, and room for every
+        # query shape in the statement cache
+        conn = sqlite3.connect(
+            self._db_path,
+            check_same_thread=False,
+            cached_statements=256,
+            isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        
+        # Optimize for read performance
+        conn.execute("PRAGMA temp_store = memory")
+        conn.execute("PRAGMA mmap_size = 268435456")  # 256MB
+        conn.execute("PRAGMA cache_size = -65536")  # 64MB
+        
+        # Nothing is written at runtime, so skip journaling and syncing, and
+        # keep the shared lock once taken instead of re-acquiring it per
+        # statement (readers never block each other)
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        conn.execute("PRAGMA query_only = 1")
+        
+        self.prepare_statements(conn)
+        
+        return conn
+    
+    def _migrate(self) -> None:
+        """Apply one-time schema changes before read-only connections open."""
+        conn = sqlite3.connect(self._db_path)
+        try:
+            # Readers only need shared locks; a rollback journal lets them
+            # turn journaling off entirely, which WAL mode would not allow
+            conn.execute("PRAGMA journal_mode = DELETE")
+            
+            # Normally already done when the database was built; this only
+            # does work for a freshly downloaded, unindexed file
+            available = build_indexes(conn)
+            self.has_spatial_index = available["spatial"]
+            self.has_geohash_index = available["geohash"]
+            
+            # Refresh any statistics that have gone stale; a bounded
+            # analysis, and a no-op when nothing needs it
+            conn.execute("PRAGMA analysis_limit = 1000")
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+    
+    @classmethod
+    def register_statement(cls, name: str, query: str) -> None:
+        """Register a hot query to be primed when the connection is opened."""
+        cls._prepared[name] = query
+    
+    @classmethod
+    def register_close_hook(cls, hook: Callable[[], None]) -> None:
+        """Register a callback (e.g. a cache clear) to run when connections close."""
+        cls._close_hooks.append(hook)
+    
+    def prepare_statements(self, conn: sqlite3.Connection) -> None:
+        """Run every registered query once on a new connection.
+        
+        This compiles each statement into the connection's statement cache
+        under its real SQL text and reads the index pages it seeks through.
+        """
+        for query in self._prepared.values():
+            # A non-NULL sentinel, so every comparison really seeks its index
+            # (NULL would short-circuit before reading any page)
+            params = (1,) * query.count("?")
+            try:
+                cursor = conn.execute(query, params)
+            except sqlite3.OperationalError:
+                # e.g. the R*Tree query when the spatial index is unavailable
+                continue
+            cursor.fetchone()
+            cursor.close()
+    
+    def warmup(self) -> None:
+        """Fault in the table and index pages used by the tools."""
+        with self.acquire() as conn:
+            # Full table pass plus a primary lookup and a coordinate range scan
+            conn.execute("SELECT COUNT(*) FROM postal_codes").fetchone()
+            conn.execute("SELECT * FROM postal_codes WHERE zcta_code = ?", ("00000",)).fetchall()
+            conn.execute(
+                "SELECT zcta_code FROM postal_codes WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?",
+                (47.0, 48.0, -123.0, -122.0)
+            ).fetchall()
+    
+    def _drain_pool(self) -> None:
+        """Remove everything waiting in the pool."""
+        while True:
+            try:
+                self._pool.get_nowait()
+            except queue.Empty:
+                return
+    
+    def close(self) -> None:
+        """Close all database connections.
+        
+        Threads waiting in ``acquire()`` raise instead of blocking forever;
+        a later ``acquire()`` or ``connect()`` reopens the pool.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._drain_pool()
+            if connections:
+                self._pool.put(_POOL_CLOSED)
+        
+        for conn in connections:
+            conn.close()
+        # Anything cached from the old connections may be stale on reconnect
+        for hook in self._close_hooks:
+            hook()
+        if connections:
+            logger.info("Database connection closed")
+
+
+# Shared instance used by the query layer and the server
+db_connection = DatabaseConnection()
@@ -0,0 +1,74 @@
+"""32-bit integer geohash used as a spatial index when R*Tree is unavailable.
+
+Latitude and longitude are each quantized to 16 bits and their bits are
+interleaved (longitude first, as in standard geohash), so every geohash cell
+at any precision is one contiguous range of codes and can be read with a
+B-tree range scan.
+"""
+
+from typing import List, Tuple
+
+BITS_PER_AXIS = 16
+_AXIS_CELLS = 1 << BITS_PER_AXIS
+
+# At most this many cells are scanned per query
+MAX_CELLS = 9
+
+
+def _spread(value: int) -> int:
+    """Spread the low 16 bits of ``value`` to the even bit positions."""
+    value &= 0xFFFF
+    value = (value | (value << 8)) & 0x00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F
+    value = (value | (value << 2)) & 0x33333333
+    value = (value | (value << 1)) & 0x55555555
+    return value
+
+
+def _quantize(lat: float, lng: float) -> Tuple[int, int]:
+    """Map a coordinate to its (x, y) cell at full precision."""
+    x = int((lng + 180.0) / 360.0 * _AXIS_CELLS)
+    y = int((lat + 90.0) / 180.0 * _AXIS_CELLS)
+    return min(max(x, 0), _AXIS_CELLS - 1), min(max(y, 0), _AXIS_CELLS - 1)
+
+
+def geohash32(lat: float, lng: float) -> int:
+    """Encode a coordinate as a 32-bit interleaved geohash."""
+    x, y = _quantize(lat, lng)
+    return (_spread(x) << 1) | _spread(y)
+
+
+def cell_ranges(
+    min_lat: float,
+    max_lat: float,
+    min_lng: float,
+    max_lng: float
+) -> List[Tuple[int, int]]:
+    """Half-open geohash32 ranges for the cells covering a bounding box.
+
+    Uses the finest precision at which the box needs at most MAX_CELLS
+    cells; adjacent ranges are merged.
+    """
+    x0, y0 = _quantize(min_lat, min_lng)
+    x1, y1 = _quantize(max_lat, max_lng)
+
+    shift = 0
+    while (((x1 >> shift) - (x0 >> shift) + 1) * ((y1 >> shift) - (y0 >> shift) + 1) > MAX_CELLS
+           and shift < BITS_PER_AXIS):
+        shift += 1
+
+    # Each cell at this precision spans 4**shift full-precision codes
+    span = 1 << (2 * shift)
+    starts = sorted(
+        ((_spread(x) << 1) | _spread(y)) << (2 * shift)
+        for x in range(x0 >> shift, (x1 >> shift) + 1)
+        for y in range(y0 >> shift, (y1 >> shift) + 1)
+    )
+
+    ranges: List[Tuple[int, int]] = []
+    for start in starts:
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], start + span)
+        else:
+            ranges.append((start, start + span))
+    return ranges
@@ -1,11 +1,14 @@
 """Data models and validation schemas for postal code operations."""
 
-from typing import Optional, Literal, List
-from pydantic import BaseModel, Field, validator
+from types import MappingProxyType
+from typing import Annotated, Mapping, Optional, Literal, List
+import msgspec
+from msgspec import Meta
 import sqlite3
+import sys
 
 
-class PostalCodeRecord(BaseModel):
+class PostalCodeRecord(msgspec.Struct, frozen=True):
     """Database record for a postal code."""
     zcta_code: str
     latitude: float
@@ -22,27 +25,29 @@ class PostalCodeRecord(BaseModel):
         return self.zcta_code
 
 
-class GeoNamesResult(BaseModel):
+class GeoNamesResult(msgspec.Struct):
     """GeoNames-compatible result format."""
     postalCode: str
-    placeName: Optional[str] = None
     countryCode: str
     lat: float
     lng: float
     adminCode1: str
     adminName1: str
+    placeName: Optional[str] = None
     distance: Optional[float] = None
     landArea: Optional[float] = None
     waterArea: Optional[float] = None
 
 
-class GeoNamesResponse(BaseModel):
+class GeoNamesResponse(msgspec.Struct):
     """GeoNames-compatible response format."""
     totalResultsCount: int
     geonames: List[GeoNamesResult]
 
 
-class PostalSearchInput(BaseModel):
+# Input models are validated with msgspec.convert(), which enforces the
+# Meta constraints below; calling the constructor directly does not
+class PostalSearchInput(msgspec.Struct):
     """Input parameters for postal code search."""
     postalcode: Optional[str] = None
     postalcode_startsWith: Optional[str] = None
@@ -50,21 +55,27 @@ class PostalSearchInput(BaseModel):
     placename_startsWith: Optional[str] = None
     country: Optional[Literal["US"]] = None
     countryBias: Optional[str] = None
-    maxRows: int = Field(default=10, ge=1, le=100)
+    maxRows: Annotated[int, Meta(ge=1, le=100)] = 10
     style: Literal["SHORT", "MEDIUM", "LONG", "FULL"] = "MEDIUM"
     operator: Literal["AND", "OR"] = "AND"
 
 
-class ReverseGeocodeInput(BaseModel):
+class PostalBatchInput(msgspec.Struct):
+    """Input parameters for a batched exact postal code lookup."""
+    postalcodes: Annotated[List[str], Meta(min_length=1, max_length=500)]
+    style: Literal["SHORT", "MEDIUM", "LONG", "FULL"] = "MEDIUM"
+
+
+class ReverseGeocodeInput(msgspec.Struct):
     """Input parameters for reverse geocoding."""
-    latitude: float = Field(..., ge=-90, le=90)
-    longitude: float = Field(..., ge=-180, le=180)
-    radius: float = Field(default=5.0, ge=0.1, le=100)
-    maxResults: int = Field(default=10, ge=1, le=100)
+    latitude: Annotated[float, Meta(ge=-90, le=90)]
+    longitude: Annotated[float, Meta(ge=-180, le=180)]
+    radius: Annotated[float, Meta(ge=0.1, le=100)] = 5.0
+    maxResults: Annotated[int, Meta(ge=1, le=100)] = 10
 
 
 # State code mapping for adminName1 field
-STATE_NAMES = {
+_STATE_NAMES = {
     'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas',
     'CA': 'California', 'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware',
     'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho',
@@ -82,16 +93,17 @@ STATE_NAMES = {
     'GU': 'Guam', 'MP': 'Northern Mariana Islands'
 }
 
+# Read-only view with interned names, so every result shares one string
+# object per state
+STATE_NAMES: Mapping[str, str] = MappingProxyType(
+    {code: sys.intern(name) for code, name in _STATE_NAMES.items()}
+)
+
 
 def row_to_postal_record(row: sqlite3.Row) -> PostalCodeRecord:
-    """Convert SQLite row to PostalCodeRecord."""
-    return PostalCodeRecord(
-        zcta_code=row['zcta_code'],
-        latitude=row['latitude'],
-        longitude=row['longitude'],
-        state=row['state'],
-        land_area_sqm=row['land_area_sqm'],
-        water_area_sqm=row['water_area_sqm'],
-        country_code=row['country_code'] if 'country_code' in row.keys() else 'US',
-        city=row['city'] if 'city' in row.keys() else None
-    )
\ No newline at end of file
+    """Convert SQLite row to PostalCodeRecord.
+    
+    The row must select the record columns in field order, with
+    country_code and city always present.
+    """
+    return PostalCodeRecord(*row)
@@ -1,202 +1,348 @@
 """Optimized SQL queries for postal code operations."""
 
 import sqlite3
+import functools
 import math
-import os
-import sys
-from typing import List, Optional, Dict, Any
-
-# Multi-environment import strategy for database modules
-# This ensures compatibility across different deployment scenarios
-try:
-    # Standard relative imports (preferred)
-    from .connection import DatabaseConnection
-    from .models import PostalCodeRecord, PostalSearchInput, ReverseGeocodeInput, row_to_postal_record
-except ImportError:
-    try:
-        # Absolute imports (when package is installed)
-        from mcp_postal_geocoder.server.database.connection import DatabaseConnection
-        from mcp_postal_geocoder.server.database.models import PostalCodeRecord, PostalSearchInput, ReverseGeocodeInput, row_to_postal_record
-    except ImportError:
-        # Direct file imports (for containerized environments)
-        import importlib.util
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Import connection module
-        connection_path = os.path.join(current_dir, "connection.py")
-        spec = importlib.util.spec_from_file_location("connection", connection_path)
-        connection_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(connection_module)
-        DatabaseConnection = connection_module.DatabaseConnection
-        
-        # Import models module
-        models_path = os.path.join(current_dir, "models.py")
-        spec = importlib.util.spec_from_file_location("models", models_path)
-        models_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(models_module)
-        PostalCodeRecord = models_module.PostalCodeRecord
-        PostalSearchInput = models_module.PostalSearchInput
-        ReverseGeocodeInput = models_module.ReverseGeocodeInput
-        row_to_postal_record = models_module.row_to_postal_record
+import time
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+
+from .connection import DatabaseConnection, db_connection
+from .geohash import MAX_CELLS, cell_ranges
+from .models import PostalSearchInput, ReverseGeocodeInput
+
+
+_Q_FIND_BY_CODE = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    WHERE zcta_code = ?
+"""
+
+_Q_SEARCH_BY_CODE = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    WHERE zcta_code = ?
+    ORDER BY zcta_code
+    LIMIT ?
+"""
+
+_Q_SEARCH_ALL = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    ORDER BY zcta_code
+    LIMIT ?
+"""
+
+# Formatted with one "?" placeholder per requested code
+_Q_FIND_MANY = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    WHERE zcta_code IN ({placeholders})
+"""
+
+# Prefix matches are written as a half-open range so the planner always
+# seeks idx_zcta_lookup instead of evaluating LIKE per row
+_Q_PREFIX = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    WHERE zcta_code >= ? AND zcta_code < ?
+    ORDER BY zcta_code
+    LIMIT ?
+"""
+
+_Q_PREFIX_LIKE = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    WHERE zcta_code LIKE ? || '%'
+    ORDER BY zcta_code
+    LIMIT ?
+"""
+
+# Candidate queries for reverse geocoding; exact distances are computed
+# afterwards in find_near_coordinates
+_Q_NEAR = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    WHERE latitude BETWEEN ? AND ? 
+      AND longitude BETWEEN ? AND ?
+"""
+
+_Q_NEAR_RTREE = """
+    SELECT p.zcta_code, p.latitude, p.longitude, p.state, p.land_area_sqm, p.water_area_sqm, 'US' as country_code, p.city
+    FROM postal_rtree r
+    JOIN postal_codes p ON p.rowid = r.id
+    WHERE r.maxLat >= ? AND r.minLat <= ?
+      AND r.maxLng >= ? AND r.minLng <= ?
+"""
+
+# Used when R*Tree is unavailable: one geohash32 range scan per covering
+# cell, joined with UNION ALL by _near_geohash_query()
+_Q_NEAR_GEOHASH_CELL = """
+    SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
+    FROM postal_codes 
+    WHERE geohash32 >= ? AND geohash32 < ?
+"""
+
+_Q_VALIDATE = "SELECT 1 FROM postal_codes WHERE zcta_code = ? LIMIT 1"
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+_INV_KM_PER_DEGREE = 1.0 / KM_PER_DEGREE
+
+# Precomputed factors for the haversine helpers
+_HALF_DEG_TO_RAD = math.pi / 360
+_EARTH_DIAMETER_KM = 2 * EARTH_RADIUS_KM
+
+
+@functools.lru_cache(maxsize=4096)
+def _cos_deg(lat_centi: int) -> float:
+    """Cosine of a latitude given in hundredths of a degree."""
+    return math.cos(math.radians(lat_centi / 100))
+
+
+def haversine_term_np(lat0: float, lng0: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """The haversine term ``a`` (monotonic in distance) for arrays of points."""
+    # Half-angle differences in radians, scaled in one multiply each
+    half_dlat = (lats - lat0) * _HALF_DEG_TO_RAD
+    half_dlng = (lngs - lng0) * _HALF_DEG_TO_RAD
+    cos_lats = np.cos(lats * (2 * _HALF_DEG_TO_RAD))
+    return np.sin(half_dlat) ** 2 + math.cos(math.radians(lat0)) * cos_lats * np.sin(half_dlng) ** 2
+
+
+def haversine_term_limit(radius: float) -> float:
+    """The haversine term of a point exactly ``radius`` km away."""
+    return math.sin(min(radius / _EARTH_DIAMETER_KM, math.pi / 2)) ** 2
+
+
+def haversine_distance_np(terms: np.ndarray) -> np.ndarray:
+    """Convert haversine terms to great-circle distances in km."""
+    return _EARTH_DIAMETER_KM * np.arcsin(np.sqrt(terms))
+
+
+@functools.lru_cache(maxsize=None)
+def _near_geohash_query(cells: int) -> str:
+    """Candidate query scanning ``cells`` geohash32 ranges."""
+    return " UNION ALL ".join([_Q_NEAR_GEOHASH_CELL] * cells)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# Exact lookups repeat heavily (the same ZIP is geocoded and validated
+# over and over), so their results are cached by postal code alone
+LOOKUP_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _find_by_postal_code(postal_code: str) -> Optional[sqlite3.Row]:
+    """Look up one postal code; cached across all callers."""
+    with db_connection.acquire() as conn:
+        return conn.execute(_Q_FIND_BY_CODE, (postal_code,)).fetchone()
+
+
+@functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _validate_postal_code(postal_code: str) -> bool:
+    """Check whether one postal code exists; cached across all callers."""
+    with db_connection.acquire() as conn:
+        return conn.execute(_Q_VALIDATE, (postal_code,)).fetchone() is not None
+
+
+# Table-wide counts are full scans over data that practically never
+# changes, so they are served from memory and refreshed every few minutes
+STATS_TTL_SECONDS = 300.0
+
+_stats_cache: Dict[str, Any] = {"value": None, "ts": 0.0}
+
+
+def _table_stats() -> Dict[str, int]:
+    """Count records and states and measure the file, cached for STATS_TTL_SECONDS."""
+    now = time.monotonic()
+    if _stats_cache["value"] is not None and now - _stats_cache["ts"] < STATS_TTL_SECONDS:
+        return _stats_cache["value"]
+    
+    with db_connection.acquire() as conn:
+        total_records = conn.execute("SELECT COUNT(*) as count FROM postal_codes").fetchone()['count']
+        unique_states = conn.execute("SELECT COUNT(DISTINCT state) as count FROM postal_codes").fetchone()['count']
+        
+        # Database file size (approximate)
+        try:
+            db_size = conn.execute(
+                "SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()"
+            ).fetchone()['size']
+        except sqlite3.Error:
+            db_size = 0
+    
+    value = {"totalRecords": total_records, "uniqueStates": unique_states, "databaseSize": db_size}
+    _stats_cache.update(value=value, ts=now)
+    return value
+
+
+def _clear_table_stats() -> None:
+    """Drop the cached table stats."""
+    _stats_cache.update(value=None, ts=0.0)
+
+
+for _clear in (_find_by_postal_code.cache_clear, _validate_postal_code.cache_clear, _clear_table_stats):
+    DatabaseConnection.register_close_hook(_clear)
+
+
+# Prime the hot statements whenever the database connection is opened
+for _name, _query in (
+    ("find_by_code", _Q_FIND_BY_CODE),
+    ("prefix", _Q_PREFIX),
+    ("search_by_code", _Q_SEARCH_BY_CODE),
+    ("near", _Q_NEAR),
+    ("near_rtree", _Q_NEAR_RTREE),
+    ("validate", _Q_VALIDATE),
+):
+    DatabaseConnection.register_statement(_name, _query)
+
+# Geohash candidate queries come in one shape per merged cell count
+for _cells in range(1, MAX_CELLS + 1):
+    DatabaseConnection.register_statement(f"near_geohash_{_cells}", _near_geohash_query(_cells))
 
 
 class PostalQueries:
-    """High-performance postal code query operations."""
+    """High-performance postal code query operations.
+    
+    Lookups return ``sqlite3.Row`` objects as fetched; the tool layer formats
+    them directly. Use ``row_to_postal_record`` where a typed record is needed.
+    """
     
     def __init__(self) -> None:
-        self.db_conn = DatabaseConnection()
+        self.db_conn = db_connection
     
-    def find_by_postal_code(self, postal_code: str) -> Optional[PostalCodeRecord]:
+    def find_by_postal_code(self, postal_code: str) -> Optional[sqlite3.Row]:
         """Find exact postal code match."""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor()
+        return _find_by_postal_code(postal_code)
+    
+    def find_many(self, postal_codes: List[str]) -> Dict[str, List[sqlite3.Row]]:
+        """Find exact matches for many postal codes with a single query.
         
-        query = """
-            SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
-            FROM postal_codes 
-            WHERE zcta_code = ?
+        Returns a mapping from each requested code to its rows; codes
+        without a match map to an empty list.
         """
+        unique_codes = list(dict.fromkeys(postal_codes))
+        grouped: Dict[str, List[sqlite3.Row]] = {code: [] for code in unique_codes}
+        if not unique_codes:
+            return grouped
+        
+        query = _Q_FIND_MANY.format(placeholders=", ".join("?" * len(unique_codes)))
+        with self.db_conn.acquire() as conn:
+            rows = conn.execute(query, unique_codes).fetchall()
         
-        cursor.execute(query, (postal_code,))
-        row = cursor.fetchone()
+        for row in rows:
+            grouped[row["zcta_code"]].append(row)
         
-        if row:
-            return row_to_postal_record(row)
-        return None
+        return grouped
     
-    def find_by_prefix(self, prefix: str, limit: int = 10) -> List[PostalCodeRecord]:
+    def find_by_prefix(self, prefix: str, limit: int = 10) -> List[sqlite3.Row]:
         """Find postal codes starting with prefix."""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
-            FROM postal_codes 
-            WHERE zcta_code LIKE ? || '%'
-            ORDER BY zcta_code
-            LIMIT ?
-        """
-        
-        cursor.execute(query, (prefix, limit))
-        rows = cursor.fetchall()
-        
-        return [row_to_postal_record(row) for row in rows]
+        with self.db_conn.acquire() as conn:
+            if prefix:
+                return conn.execute(_Q_PREFIX, (prefix, prefix_upper_bound(prefix), limit)).fetchall()
+            return conn.execute(_Q_PREFIX_LIKE, (prefix, limit)).fetchall()
     
-    def search(self, params: PostalSearchInput) -> List[PostalCodeRecord]:
+    def search(self, params: PostalSearchInput) -> List[sqlite3.Row]:
         """Advanced search with multiple criteria."""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city
-            FROM postal_codes 
-            WHERE 1=1
-        """
-        
-        query_params: List[Any] = []
-        
+        # One fixed statement per search shape, so each stays prepared in
+        # the connection's statement cache
         if params.postalcode:
-            query += " AND zcta_code = ?"
-            query_params.append(params.postalcode)
+            query = _Q_SEARCH_BY_CODE
+            query_params: Tuple[Any, ...] = (params.postalcode, params.maxRows)
         elif params.postalcode_startsWith:
-            query += " AND zcta_code LIKE ? || '%'"
-            query_params.append(params.postalcode_startsWith)
-        
-        query += " ORDER BY zcta_code LIMIT ?"
-        query_params.append(params.maxRows)
+            prefix = params.postalcode_startsWith
+            query = _Q_PREFIX
+            query_params = (prefix, prefix_upper_bound(prefix), params.maxRows)
+        else:
+            query = _Q_SEARCH_ALL
+            query_params = (params.maxRows,)
         
-        cursor.execute(query, query_params)
-        rows = cursor.fetchall()
-        
-        return [row_to_postal_record(row) for row in rows]
+        with self.db_conn.acquire() as conn:
+            return conn.execute(query, query_params).fetchall()
     
     def find_near_coordinates(
         self, 
         params: ReverseGeocodeInput
-    ) -> List[Dict[str, Any]]:
-        """Find postal codes near coordinates with distance calculation."""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor()
+    ) -> List[Tuple[sqlite3.Row, float]]:
+        """Find postal codes near coordinates, nearest first.
         
+        Returns ``(row, distance_km)`` pairs.
+        """
         lat, lng, radius, max_results = params.latitude, params.longitude, params.radius, params.maxResults
         
-        # Calculate bounding box for performance optimization
-        lat_range = radius / 111.32  # roughly 1 degree latitude = 111.32 km
-        lng_range = radius / (111.32 * math.cos(math.radians(lat)))
+        # Calculate bounding box for performance optimization, widening the
+        # longitude range at the poleward edge so no candidate is missed
+        lat_range = radius * _INV_KM_PER_DEGREE
+        # Rounded poleward to 0.01 degrees for the cosine cache, which only
+        # widens the box
+        edge_lat_centi = min(math.ceil((abs(lat) + lat_range) * 100), 9000)
+        lng_range = lat_range / max(_cos_deg(edge_lat_centi), 1e-6)
         
         min_lat = lat - lat_range
         max_lat = lat + lat_range
         min_lng = lng - lng_range
         max_lng = lng + lng_range
         
-        query = """
-            SELECT zcta_code, latitude, longitude, state, land_area_sqm, water_area_sqm, 'US' as country_code, city,
-                   SQRT(
-                       (latitude - ?) * (latitude - ?) + 
-                       (longitude - ?) * (longitude - ?)
-                   ) * 111.32 as distance
-            FROM postal_codes 
-            WHERE latitude BETWEEN ? AND ? 
-              AND longitude BETWEEN ? AND ?
-              AND SQRT(
-                  (latitude - ?) * (latitude - ?) + 
-                  (longitude - ?) * (longitude - ?)
-              ) * 111.32 <= ?
-            ORDER BY distance 
-            LIMIT ?
-        """
+        # Checked out first: the index flags are set when the pool opens
+        with self.db_conn.acquire() as conn:
+            # The R*Tree prunes candidates to the bounding box in O(log n);
+            # the geohash cells cover a somewhat larger area, and the
+            # bounding box scan is the last resort
+            if self.db_conn.has_spatial_index:
+                rows = conn.execute(_Q_NEAR_RTREE, (min_lat, max_lat, min_lng, max_lng)).fetchall()
+            elif self.db_conn.has_geohash_index:
+                ranges = cell_ranges(min_lat, max_lat, min_lng, max_lng)
+                rows = conn.execute(
+                    _near_geohash_query(len(ranges)),
+                    [bound for cell in ranges for bound in cell]
+                ).fetchall()
+            else:
+                rows = conn.execute(_Q_NEAR, (min_lat, max_lat, min_lng, max_lng)).fetchall()
         
-        query_params = [
-            lat, lat, lng, lng,  # distance calculation
-            min_lat, max_lat, min_lng, max_lng,  # bounding box
-            lat, lat, lng, lng,  # distance filter
-            radius,
-            max_results
-        ]
+        if not rows:
+            return []
         
-        cursor.execute(query, query_params)
-        rows = cursor.fetchall()
+        # Exact distances for the whole candidate set in one vectorized pass
+        count = len(rows)
+        lats = np.fromiter((row["latitude"] for row in rows), dtype=np.float64, count=count)
+        lngs = np.fromiter((row["longitude"] for row in rows), dtype=np.float64, count=count)
+        terms = haversine_term_np(lat, lng, lats, lngs)
         
-        results = []
-        for row in rows:
-            record_dict = dict(row)
-            results.append(record_dict)
+        # The haversine term grows with distance, so filter and rank on it
+        # and only take sqrt/arcsin for the rows actually returned
+        within = np.flatnonzero(terms <= haversine_term_limit(radius))
+        if len(within) > max_results:
+            # Only the nearest max_results need ordering
+            keep = np.argpartition(terms[within], max_results - 1)[:max_results]
+            within = within[keep]
+        nearest = within[np.argsort(terms[within], kind="stable")]
+        distances = haversine_distance_np(terms[nearest])
         
-        return results
+        return [(rows[i], float(distance)) for i, distance in zip(nearest, distances)]
     
     def validate_postal_code(self, postal_code: str) -> bool:
         """Check if postal code exists in database."""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor()
-        
-        query = "SELECT 1 FROM postal_codes WHERE zcta_code = ? LIMIT 1"
-        cursor.execute(query, (postal_code,))
-        
-        return cursor.fetchone() is not None
+        return _validate_postal_code(postal_code)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor()
-        
-        # Total records
-        cursor.execute("SELECT COUNT(*) as count FROM postal_codes")
-        total_records = cursor.fetchone()['count']
+        stats = _table_stats()
         
-        # Unique states
-        cursor.execute("SELECT COUNT(DISTINCT state) as count FROM postal_codes")
-        unique_states = cursor.fetchone()['count']
-        
-        # Database file size (approximate)
-        try:
-            cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
-            db_size = cursor.fetchone()['size']
-        except:
-            db_size = 0
+        lookup_info = _find_by_postal_code.cache_info()
+        validate_info = _validate_postal_code.cache_info()
         
         return {
-            "totalRecords": total_records,
-            "uniqueStates": unique_states,
-            "databaseSize": db_size,
-            "status": "connected"
-        }
\ No newline at end of file
+            "totalRecords": stats["totalRecords"],
+            "uniqueStates": stats["uniqueStates"],
+            "databaseSize": stats["databaseSize"],
+            "status": "connected",
+            "lookupCache": {
+                "hits": lookup_info.hits + validate_info.hits,
+                "misses": lookup_info.misses + validate_info.misses,
+                "size": lookup_info.currsize + validate_info.currsize
+            }
+        }
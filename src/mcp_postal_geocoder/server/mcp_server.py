@@ -2,63 +2,24 @@
 
 import sys
 import os
+import asyncio
+import functools
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional
+import msgspec
 from mcp.server.fastmcp import FastMCP
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Multi-environment import strategy for maximum compatibility
-# This handles: installed packages, direct execution, container deployments, etc.
-try:
-    # Strategy 1: Standard package imports (development with installed package)
-    from mcp_postal_geocoder.server.database.connection import DatabaseConnection
-    from mcp_postal_geocoder.server.database.queries import PostalQueries
-    from mcp_postal_geocoder.server.database.models import PostalSearchInput, ReverseGeocodeInput
-    logger.info("Using installed package imports")
-except ImportError:
-    # Strategy 2: Add source directory to path and retry
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    src_dir = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-    
-    if os.path.exists(src_dir) and src_dir not in sys.path:
-        sys.path.insert(0, src_dir)
-    
-    try:
-        from mcp_postal_geocoder.server.database.connection import DatabaseConnection
-        from mcp_postal_geocoder.server.database.queries import PostalQueries
-        from mcp_postal_geocoder.server.database.models import PostalSearchInput, ReverseGeocodeInput
-        logger.info("Using path-modified imports")
-    except ImportError:
-        # Strategy 3: Direct file imports (for containerized environments)
-        logger.info("Falling back to direct file imports")
-        import importlib.util
-        
-        # Import connection module
-        connection_path = os.path.join(current_dir, "database", "connection.py")
-        spec = importlib.util.spec_from_file_location("connection", connection_path)
-        connection_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(connection_module)
-        DatabaseConnection = connection_module.DatabaseConnection
-        
-        # Import queries module  
-        queries_path = os.path.join(current_dir, "database", "queries.py")
-        spec = importlib.util.spec_from_file_location("queries", queries_path)
-        queries_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(queries_module)
-        PostalQueries = queries_module.PostalQueries
-        
-        # Import models module
-        models_path = os.path.join(current_dir, "database", "models.py")
-        spec = importlib.util.spec_from_file_location("models", models_path)
-        models_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(models_module)
-        PostalSearchInput = models_module.PostalSearchInput
-        ReverseGeocodeInput = models_module.ReverseGeocodeInput
-        
-        logger.info("Direct file imports successful")
+# Running this file directly (python .../mcp_server.py) does not put the
+# package on the path; every other entry point imports it normally
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from mcp_postal_geocoder.server.database.connection import POOL_SIZE, db_connection
+from mcp_postal_geocoder.server.database.queries import PostalQueries
+from mcp_postal_geocoder.server.database.models import PostalBatchInput, PostalSearchInput, ReverseGeocodeInput
 
 # Create MCP server
 mcp = FastMCP("postal-geocoder")
@@ -66,87 +27,231 @@ mcp = FastMCP("postal-geocoder")
 # Initialize database components
 queries = PostalQueries()
 
-# Database now has correct states, so we can use them directly
+# Tool results are pure functions of their arguments over the read-only
+# database, so they are memoized for the lifetime of the process
+TOOL_CACHE_SIZE = 16384
 
-@mcp.tool()
-def postal_code_search(
-    postal_code: str,
-    style: str = "MEDIUM"
+# Reverse geocoding cache keys round coordinates to ~11m
+COORDINATE_CACHE_PRECISION = 4
+
+# SQLite calls block, so they run on worker threads (each checking out a
+# pooled connection) instead of stalling the event loop for other requests
+DB_POOL = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="postal-db")
+
+
+async def run_in_db_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking database function on the database thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(DB_POOL, func, *args)
+
+# Response styles that include land and water area
+_EXTENDED_STYLES = frozenset({"LONG", "FULL"})
+
+
+def _format_item(
+    row: Mapping[str, Any],
+    style: str,
+    extra: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
-    """Search for a postal code"""
-    try:
-        params = PostalSearchInput(
-            postalcode=postal_code,
-            postalcode_startsWith=None,
-            country="US",
-            maxRows=10,
-            style=style
-        )
-        
-        records = queries.search(params)
-        
-        # Convert to GeoNames-compatible format
-        geonames = []
-        for record in records:
-            item = {
-                "postalCode": record.postal_code,
-                "lat": record.latitude,
-                "lng": record.longitude,
-                "countryCode": record.country_code,
-                "state": record.state,
-                "placeName": record.city or "Unknown"
-            }
-            
-            if style in ["LONG", "FULL"]:
-                item.update({
-                    "landArea": record.land_area_sqm,
-                    "waterArea": record.water_area_sqm
-                })
-                
-            geonames.append(item)
+    """Format one postal code row as a GeoNames-compatible item."""
+    item = {
+        "postalCode": row["zcta_code"],
+        "lat": row["latitude"],
+        "lng": row["longitude"],
+        "countryCode": row["country_code"],
+        "state": row["state"],
+        "placeName": row["city"] or "Unknown"
+    }
+    if extra:
+        item.update(extra)
+    if style in _EXTENDED_STYLES:
+        item["landArea"] = row["land_area_sqm"]
+        item["waterArea"] = row["water_area_sqm"]
+    return item
+
+# Database now has correct states, so we can use them directly
+
+@functools.lru_cache(maxsize=TOOL_CACHE_SIZE)
+def _postal_code_search(postal_code: str, style: str, prefix: bool, max_results: int) -> Dict[str, Any]:
+    """Build the postal_code_search response."""
+    params = msgspec.convert({
+        "postalcode": None if prefix else postal_code,
+        "postalcode_startsWith": postal_code if prefix else None,
+        "country": "US",
+        "maxRows": max_results,
+        "style": style
+    }, PostalSearchInput)
+    
+    rows = queries.search(params)
+    
+    # Convert to GeoNames-compatible format
+    geonames = [_format_item(row, style) for row in rows]
+    
+    return {
+        "totalResultsCount": len(geonames),
+        "geonames": geonames
+    }
+
+def _postal_code_search_many(postal_codes: List[str], style: str) -> Dict[str, Any]:
+    """Build the postal_code_search_many response."""
+    params = msgspec.convert({
+        "postalcodes": postal_codes,
+        "style": style
+    }, PostalBatchInput)
+    
+    grouped = queries.find_many(params.postalcodes)
+    
+    results = []
+    for postal_code in params.postalcodes:
+        geonames = [_format_item(row, style) for row in grouped.get(postal_code, [])]
         
-        return {
+        results.append({
+            "postalCode": postal_code,
             "totalResultsCount": len(geonames),
             "geonames": geonames
-        }
+        })
+    
+    return {
+        "totalResultsCount": sum(result["totalResultsCount"] for result in results),
+        "results": results
+    }
+
+@functools.lru_cache(maxsize=TOOL_CACHE_SIZE)
+def _geocode_postal(postal_code: str, style: str) -> Dict[str, Any]:
+    """Build the geocode_postal response."""
+    row = queries.find_by_postal_code(postal_code)
+    
+    if row:
+        item = _format_item(row, style)
         
+        return {
+            "totalResultsCount": 1,
+            "geonames": [item]
+        }
+    else:
+        return {"totalResultsCount": 0, "geonames": []}
+
+def _geocode_postal_many(postal_codes: List[str], style: str) -> Dict[str, Any]:
+    """Build the geocode_postal_many response."""
+    params = msgspec.convert({
+        "postalcodes": postal_codes,
+        "style": style
+    }, PostalBatchInput)
+    
+    grouped = queries.find_many(params.postalcodes)
+    
+    # Geocoded codes in request order; each resolves to its first match
+    geonames = [
+        _format_item(row, style)
+        for row in (grouped[code][0] for code in params.postalcodes if grouped.get(code))
+    ]
+    
+    return {
+        "totalResultsCount": len(geonames),
+        "geonames": geonames,
+        "notFound": [code for code in params.postalcodes if not grouped.get(code)]
+    }
+
+@functools.lru_cache(maxsize=TOOL_CACHE_SIZE)
+def _reverse_geocode(
+    latitude: float,
+    longitude: float,
+    radius: float,
+    max_results: int,
+    style: str
+) -> Dict[str, Any]:
+    """Build the reverse_geocode response."""
+    params = msgspec.convert({
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius": radius,
+        "maxResults": max_results
+    }, ReverseGeocodeInput)
+    
+    results = queries.find_near_coordinates(params)
+    
+    geonames = [
+        _format_item(row, style, {"distance": distance})
+        for row, distance in results
+    ]
+    
+    return {
+        "totalResultsCount": len(geonames),
+        "geonames": geonames
+    }
+
+@functools.lru_cache(maxsize=TOOL_CACHE_SIZE)
+def _validate_postal(postal_code: str) -> Dict[str, Any]:
+    """Build the validate_postal response."""
+    return {
+        "postalCode": postal_code,
+        "valid": queries.validate_postal_code(postal_code)
+    }
+
+# Memoized tool builders; cleared with the query caches when the database
+# connection closes, so a reconnect never serves results from the old file
+_TOOL_CACHES = (_postal_code_search, _geocode_postal, _reverse_geocode, _validate_postal)
+
+for _cached in _TOOL_CACHES:
+    db_connection.register_close_hook(_cached.cache_clear)
+
+def _postal_stats() -> Dict[str, Any]:
+    """Build the postal_stats response.
+    
+    lookupCache only sees lookups the tool caches missed, so both layers
+    are reported.
+    """
+    stats = queries.get_stats()
+    infos = [cached.cache_info() for cached in _TOOL_CACHES]
+    stats["toolCache"] = {
+        "hits": sum(info.hits for info in infos),
+        "misses": sum(info.misses for info in infos),
+        "size": sum(info.currsize for info in infos)
+    }
+    return stats
+
+@mcp.tool()
+async def postal_code_search(
+    postal_code: str,
+    style: str = "MEDIUM",
+    prefix: bool = False,
+    maxResults: int = 10
+) -> Dict[str, Any]:
+    """Search for a postal code, or for codes starting with it when prefix is set"""
+    try:
+        return await run_in_db_pool(_postal_code_search, postal_code, style, prefix, maxResults)
     except Exception as e:
         return {"error": str(e), "totalResultsCount": 0, "geonames": []}
 
 @mcp.tool()
-def geocode_postal(postalCode: str, style: str = "MEDIUM") -> Dict[str, Any]:
+async def postal_code_search_many(
+    postal_codes: List[str],
+    style: str = "MEDIUM"
+) -> Dict[str, Any]:
+    """Search for up to 500 postal codes in one call"""
+    try:
+        return await run_in_db_pool(_postal_code_search_many, postal_codes, style)
+    except Exception as e:
+        return {"error": str(e), "totalResultsCount": 0, "results": []}
+
+@mcp.tool()
+async def geocode_postal(postalCode: str, style: str = "MEDIUM") -> Dict[str, Any]:
     """Convert postal code to coordinates"""
     try:
-        record = queries.find_by_postal_code(postalCode)
-        
-        if record:
-            item = {
-                "postalCode": record.postal_code,
-                "lat": record.latitude,
-                "lng": record.longitude,
-                "countryCode": record.country_code,
-                "state": record.state,
-                "placeName": record.city or "Unknown"
-            }
-            
-            if style in ["LONG", "FULL"]:
-                item.update({
-                    "landArea": record.land_area_sqm,
-                    "waterArea": record.water_area_sqm
-                })
-            
-            return {
-                "totalResultsCount": 1,
-                "geonames": [item]
-            }
-        else:
-            return {"totalResultsCount": 0, "geonames": []}
-            
+        return await run_in_db_pool(_geocode_postal, postalCode, style)
     except Exception as e:
         return {"error": str(e), "totalResultsCount": 0, "geonames": []}
 
 @mcp.tool()
-def reverse_geocode(
+async def geocode_postal_many(postalCodes: List[str], style: str = "MEDIUM") -> Dict[str, Any]:
+    """Convert up to 500 postal codes to coordinates in one call"""
+    try:
+        return await run_in_db_pool(_geocode_postal_many, postalCodes, style)
+    except Exception as e:
+        return {"error": str(e), "totalResultsCount": 0, "geonames": [], "notFound": []}
+
+@mcp.tool()
+async def reverse_geocode(
     latitude: float,
     longitude: float,
     radius: float = 5.0,
@@ -155,52 +260,22 @@ def reverse_geocode(
 ) -> Dict[str, Any]:
     """Find postal codes near coordinates"""
     try:
-        params = ReverseGeocodeInput(
-            latitude=latitude,
-            longitude=longitude,
-            radius=radius,
-            maxResults=maxResults
+        return await run_in_db_pool(
+            _reverse_geocode,
+            round(latitude, COORDINATE_CACHE_PRECISION),
+            round(longitude, COORDINATE_CACHE_PRECISION),
+            radius,
+            maxResults,
+            style
         )
-        
-        results = queries.find_near_coordinates(params)
-        
-        geonames = []
-        for result in results:
-            item = {
-                "postalCode": result["zcta_code"],
-                "lat": result["latitude"],
-                "lng": result["longitude"],
-                "countryCode": result["country_code"],
-                "state": result["state"],
-                "placeName": result.get("city", "Unknown"),
-                "distance": result.get("distance", 0)
-            }
-            
-            if style in ["LONG", "FULL"]:
-                item.update({
-                    "landArea": result.get("land_area_sqm", 0),
-                    "waterArea": result.get("water_area_sqm", 0)
-                })
-                
-            geonames.append(item)
-        
-        return {
-            "totalResultsCount": len(geonames),
-            "geonames": geonames
-        }
-        
     except Exception as e:
         return {"error": str(e), "totalResultsCount": 0, "geonames": []}
 
 @mcp.tool()
-def validate_postal(postalCode: str) -> Dict[str, Any]:
+async def validate_postal(postalCode: str) -> Dict[str, Any]:
     """Validate if postal code exists"""
     try:
-        is_valid = queries.validate_postal_code(postalCode)
-        return {
-            "postalCode": postalCode,
-            "valid": is_valid
-        }
+        return await run_in_db_pool(_validate_postal, postalCode)
     except Exception as e:
         return {
             "postalCode": postalCode,
@@ -209,18 +284,23 @@ def validate_postal(postalCode: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
-def postal_stats() -> Dict[str, Any]:
+async def postal_stats() -> Dict[str, Any]:
     """Get database statistics and health information"""
     try:
-        return queries.get_stats()
+        return await run_in_db_pool(_postal_stats)
     except Exception as e:
         return {"error": str(e), "status": "error"}
 
 def main() -> None:
     """Entry point for the MCP server."""
+    # Logs go to stderr; stdout carries the MCP protocol
+    logging.basicConfig(level=logging.INFO)
+    
     # Initialize database connection
-    db_conn = DatabaseConnection()
-    db_conn.connect()
+    db_connection.connect()
+    
+    # Warm the page cache so the first tool call runs at steady-state speed
+    db_connection.warmup()
     
     logger.info("Starting MCP Postal Geocoder Server...")
     mcp.run()
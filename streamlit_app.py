@@ -2,16 +2,21 @@
 
 import streamlit as st
 import asyncio
+import atexit
 import json
+import orjson
+from contextlib import AsyncExitStack
 import pandas as pd
-import folium
-from streamlit_folium import st_folium
-import plotly.express as px
-from typing import Dict, Any, List
+import streamlit.components.v1 as components
+from typing import Dict, Any, Callable, Coroutine, NamedTuple, Optional, Tuple
 import platform
+import threading
 
+import anyio
 from mcp.client.session import ClientSession
 from mcp.client.stdio import stdio_client, StdioServerParameters
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
 
 # Page configuration
 st.set_page_config(
@@ -31,12 +36,18 @@ It's a drop-in replacement for GeoNames postal code API using US Census Bureau Z
 All data is sourced from official US Census Bureau records with 33,791 postal codes.
 """)
 
+# Result fields shown by the table views (GeoNames MEDIUM style)
+RESULT_COLUMNS = ['postalCode', 'placeName', 'state', 'countryCode', 'lat', 'lng']
+REVERSE_COLUMNS = RESULT_COLUMNS + ['distance']
+
+# Map coordinates are rounded to ~1 m, finer than any zoom level here shows
+MAP_COORD_DECIMALS = 5
+
 @st.cache_data
 def get_python_command() -> str:
     """Get the appropriate Python command for the current platform."""
     return "python" if platform.system() == "Windows" else "python3"
 
-@st.cache_data
 def get_server_command() -> tuple:
     """Get the appropriate MCP server command for the current environment.
     
@@ -62,39 +73,302 @@ def get_server_command() -> tuple:
         server_file = os.path.join("src", "mcp_postal_geocoder", "server", "mcp_server.py")
         return (get_python_command(), [server_file])
 
-async def call_mcp_tool(tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, Any]:
-    """Call an MCP tool and return the result."""
+@st.cache_resource
+def get_server_params() -> StdioServerParameters:
+    """Get the MCP server launch parameters, resolved once per process.
+    
+    The command cannot change while the app runs; cache_resource hands back
+    the same object instead of the per-call copy cache_data makes.
+    """
     command, args = get_server_command()
-    server_params = StdioServerParameters(
-        command=command,
-        args=args
-    )
+    return StdioServerParameters(command=command, args=args)
+
+class MCPSessionManager:
+    """Long-lived MCP client session over one server subprocess.
     
-    try:
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
+    The stdio transport has to be closed by the task that opened it, so a
+    dedicated owner task holds it open until disconnect() is called.
+    """
+    
+    def __init__(self, server_params: StdioServerParameters) -> None:
+        self.server_params = server_params
+        self.session: Optional[ClientSession] = None
+        self._owner: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+        self._connecting: Optional[asyncio.Lock] = None
+    
+    async def _hold(self) -> None:
+        """Open the transport and session, and keep them open until closing."""
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(stdio_client(self.server_params))
+                session = await stack.enter_async_context(ClientSession(read, write))
                 await session.initialize()
-                result = await session.call_tool(tool_name, tool_args)
-                
-                if result.content:
-                    return json.loads(result.content[0].text)
-                else:
-                    return {"error": "No response received"}
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+    
+    async def connect(self) -> ClientSession:
+        """Start the server and initialize the session if not already running."""
+        # Created here so it belongs to the loop; concurrent calls start one server
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self.session is None:
+                await self.disconnect()
+                self._ready = asyncio.Event()
+                self._closing = asyncio.Event()
+                self._error = None
+                self._owner = asyncio.create_task(self._hold())
+                await self._ready.wait()
+                if self.session is None:
+                    raise RuntimeError(f"Could not start MCP server: {self._error}")
+        return self.session
+    
+    async def disconnect(self) -> None:
+        """Close the session and stop the server subprocess."""
+        if self._owner is not None:
+            self._closing.set()
+            await self._owner
+            self._owner = None
+    
+    async def call_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Any:
+        """Call a tool on the running session, starting it if needed."""
+        session = await self.connect()
+        return await session.call_tool(tool_name, tool_args)
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the app's event loop, which the MCP session lives on.
+    
+    The loop runs forever in a daemon thread, so the session's transport
+    tasks keep running between script reruns. One loop serves every
+    browser session.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="mcp-event-loop", daemon=True).start()
+    return loop
+
+@st.cache_resource
+def get_mcp_session() -> MCPSessionManager:
+    """Get the app's MCP session manager.
+    
+    The tools are stateless, so every browser session shares one server
+    process instead of each starting its own.
+    """
+    manager = MCPSessionManager(get_server_params())
+    loop = get_event_loop()
+    
+    # Stop the server subprocess when Streamlit shuts down
+    atexit.register(lambda: asyncio.run_coroutine_threadsafe(manager.disconnect(), loop).result(timeout=5))
+    return manager
+
+def _is_transport_error(error: Exception) -> bool:
+    """Check whether an error means the server connection is gone."""
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream))
+
+async def _call_tool(manager: MCPSessionManager, tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    """Call an MCP tool on the manager's session and return the result."""
+    try:
+        result = await manager.call_tool(tool_name, tool_args)
+        
+        if not result.content:
+            return {"error": "No response received"}
+        if result.isError:
+            # FastMCP reports failures such as invalid arguments as plain text
+            return {"error": result.content[0].text}
+        return orjson.loads(result.content[0].text)
     except Exception as e:
-        return {"error": str(e)}
+        if _is_transport_error(e):
+            # Start a fresh server on the next call
+            await manager.disconnect()
+        return {"error": str(e) or type(e).__name__}
+
+def call_mcp_tool(tool_name: str, tool_args: Dict[str, Any]) -> Coroutine[Any, Any, Dict[str, Any]]:
+    """Create the coroutine calling an MCP tool, for run_async.
+    
+    The session manager is looked up here, on the script thread, where
+    Streamlit's caches expect to run.
+    """
+    return _call_tool(get_mcp_session(), tool_name, tool_args)
 
 def run_async(coro):
-    """Run async function in Streamlit."""
+    """Run async function in Streamlit on the app's background loop."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+class ToolCallError(Exception):
+    """An MCP tool call that returned an error result."""
+    
+    def __init__(self, result: Dict[str, Any]) -> None:
+        super().__init__(result["error"])
+        self.result = result
+
+@st.cache_data(ttl=3600, max_entries=1024, show_spinner=False)
+def cached_tool(tool_name: str, args_json: str) -> Dict[str, Any]:
+    """Call an MCP tool, caching results by tool name and JSON arguments."""
+    result = run_async(call_mcp_tool(tool_name, json.loads(args_json)))
+    if "error" in result:
+        # Raising keeps failed calls out of the cache
+        raise ToolCallError(result)
+    return result
+
+def call_tool_cached(tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    """Call an MCP tool through the result cache."""
     try:
-        return asyncio.run(coro)
-    except RuntimeError:
-        # Handle if we're already in an async context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
+        # Sorted keys so argument order never causes a cache miss
+        return cached_tool(tool_name, json.dumps(tool_args, sort_keys=True))
+    except ToolCallError as e:
+        return e.result
+
+@st.cache_data(max_entries=256)
+def build_single_marker_map_html(lat: float, lng: float, popup: str, tooltip: str, zoom: int = 12) -> str:
+    """Render a map with a single location marker to standalone HTML."""
+    import folium
+    
+    lat, lng = round(lat, MAP_COORD_DECIMALS), round(lng, MAP_COORD_DECIMALS)
+    m = folium.Map(location=[lat, lng], zoom_start=zoom)
+    folium.Marker([lat, lng], popup=popup, tooltip=tooltip).add_to(m)
+    return m.get_root().render()
+
+@st.cache_data(max_entries=256)
+def build_reverse_map_html(
+    latitude: float,
+    longitude: float,
+    radius: float,
+    markers: Tuple[Tuple[float, float, str, str, str, float], ...]
+) -> str:
+    """Render the reverse geocoding map from (lat, lng, placeName, state, postalCode, distance) rows.
+    
+    Uses a deck.gl scatterplot, which draws every marker in one GPU layer;
+    the view is display only, so it needs nothing back from the map.
+    """
+    import pydeck as pdk
+    
+    latitude, longitude = round(latitude, MAP_COORD_DECIMALS), round(longitude, MAP_COORD_DECIMALS)
+    results = [
+        {
+            "lat": round(lat, MAP_COORD_DECIMALS),
+            "lng": round(lng, MAP_COORD_DECIMALS),
+            "label": f"{place_name}, {state} {postal_code}<br>Distance: {distance:.2f} km"
+        }
+        for lat, lng, place_name, state, postal_code, distance in markers
+    ]
+    center = [{"lat": latitude, "lng": longitude, "label": "Your Search Location"}]
+    
+    deck = pdk.Deck(
+        layers=[
+            # Search radius circle
+            pdk.Layer(
+                "ScatterplotLayer",
+                center,
+                get_position=["lng", "lat"],
+                get_radius=radius * 1000,  # Convert km to meters
+                get_fill_color=[0, 0, 255, 25],
+                get_line_color=[0, 0, 255],
+                stroked=True,
+                line_width_min_pixels=1
+            ),
+            # Postal code markers
+            pdk.Layer(
+                "ScatterplotLayer",
+                results,
+                get_position=["lng", "lat"],
+                get_radius=200,
+                radius_min_pixels=5,
+                get_fill_color=[40, 120, 200],
+                pickable=True
+            ),
+            # Search center
+            pdk.Layer(
+                "ScatterplotLayer",
+                center,
+                get_position=["lng", "lat"],
+                get_radius=300,
+                radius_min_pixels=7,
+                get_fill_color=[220, 30, 30],
+                pickable=True
+            ),
+        ],
+        initial_view_state=pdk.ViewState(latitude=latitude, longitude=longitude, zoom=10),
+        tooltip={"html": "{label}"}
+    )
+    return deck.to_html(as_string=True)
+
+@st.cache_data(max_entries=256)
+def build_prefix_map(records: Tuple[Tuple[float, float, str, str, str], ...]) -> Dict[str, Any]:
+    """Build the prefix search map figure from (lat, lng, postalCode, placeName, state) rows.
+    
+    Returns the figure spec as a dict, which st.plotly_chart takes directly.
+    """
+    import plotly.express as px
+    
+    df = pd.DataFrame.from_records(records, columns=['lat', 'lng', 'postalCode', 'placeName', 'state'])
+    fig = px.scatter_map(
+        df, 
+        lat="lat", 
+        lon="lng",
+        hover_data=["postalCode", "placeName", "state"],
+        zoom=6,
+        height=500,
+        map_style="open-street-map"
+    )
+    return fig.to_dict()
+
+# Reverse geocoding quick locations: (label, latitude, longitude)
+QUICK_LOCATIONS = [
+    ("Seattle, WA", 47.606, -122.332),
+    ("New York, NY", 40.7128, -74.0060),
+    ("Los Angeles, CA", 34.0522, -118.2437),
+    ("Chicago, IL", 41.8781, -87.6298),
+]
+
+def set_reverse_location(lat: float, lng: float) -> None:
+    """Set the reverse geocoding coordinate inputs."""
+    st.session_state.reverse_lat = lat
+    st.session_state.reverse_lng = lng
+
+class ToolResult(NamedTuple):
+    """A tool response kept for display, with the widget inputs that produced it."""
+    inputs: Tuple[Any, ...]
+    payload: Dict[str, Any]
+
+def store_result(view: str, inputs: Tuple[Any, ...], payload: Dict[str, Any]) -> None:
+    """Keep a view's latest tool response in session state."""
+    st.session_state.setdefault('results', {})[view] = ToolResult(inputs, payload)
+
+def get_result(view: str, inputs: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+    """Get a view's stored response if it was produced by the current inputs.
+    
+    After the user edits an input without re-running the tool, the stale
+    response is hidden rather than shown next to inputs it doesn't match.
+    """
+    stored = st.session_state.get('results', {}).get(view)
+    if stored is not None and stored.inputs == inputs:
+        return stored.payload
+    return None
+
+def get_rendered_html(view: str, build: Callable[..., str], *args: Any, **kwargs: Any) -> str:
+    """Get a view's rendered map HTML, rebuilding it only when its inputs change.
+    
+    The last inputs and HTML are kept in session state, so reruns triggered
+    by unrelated widgets re-emit the same HTML without even a cache lookup.
+    """
+    key = f"_{view}_render"
+    inputs = (args, kwargs)
+    last = st.session_state.get(key)
+    if last is None or last[0] != inputs:
+        last = (inputs, build(*args, **kwargs))
+        st.session_state[key] = last
+    return last[1]
 
 # Sidebar navigation
 st.sidebar.title("🛠️ Tools")
@@ -148,13 +422,12 @@ elif selected_tool == "🔍 Postal Code Search":
         postal_code = st.text_input("Enter a 5-digit postal code:", placeholder="e.g., 73717")
         if st.button("Search Postal Code", type="primary") and postal_code:
             with st.spinner("Searching..."):
-                result = run_async(call_mcp_tool("postal_code_search", {"postal_code": postal_code}))
-                st.session_state.search_result = result
-                st.session_state.search_postal_code = postal_code
+                result = call_tool_cached("postal_code_search", {"postal_code": postal_code})
+                store_result('search', (postal_code,), result)
         
         # Display results from session state
-        if hasattr(st.session_state, 'search_result'):
-            result = st.session_state.search_result
+        result = get_result('search', (postal_code,))
+        if result is not None:
             if "error" not in result and result.get('totalResultsCount', 0) > 0:
                 record = result['geonames'][0]
                 
@@ -170,15 +443,19 @@ elif selected_tool == "🔍 Postal Code Search":
                 
                 with col2:
                     st.subheader("🗺️ Map")
-                    m = folium.Map(location=[record['lat'], record['lng']], zoom_start=12)
-                    folium.Marker(
-                        [record['lat'], record['lng']],
-                        popup=f"{record['placeName']}, {record['state']} {record['postalCode']}",
-                        tooltip=f"ZIP {record['postalCode']}"
-                    ).add_to(m)
-                    st_folium(m, height=300, width=400)
+                    map_html = get_rendered_html(
+                        "search_map",
+                        build_single_marker_map_html,
+                        record['lat'],
+                        record['lng'],
+                        f"{record['placeName']}, {record['state']} {record['postalCode']}",
+                        f"ZIP {record['postalCode']}",
+                        zoom=12
+                    )
+                    components.html(map_html, height=300, width=400)
                 
-                st.json(result)
+                with st.expander("Show raw JSON response"):
+                    st.json(result)
             else:
                 st.warning("No results found for this postal code.")
     
@@ -188,33 +465,36 @@ elif selected_tool == "🔍 Postal Code Search":
         
         if st.button("Search by Prefix", type="primary") and prefix:
             with st.spinner("Searching..."):
-                result = run_async(call_mcp_tool("postal_code_search", {"postal_code": prefix}))
-                st.session_state.prefix_result = result
-                st.session_state.search_prefix = prefix
+                result = call_tool_cached("postal_code_search", {
+                    "postal_code": prefix,
+                    "prefix": True,
+                    "maxResults": max_results
+                })
+                store_result('prefix', (prefix, max_results), result)
         
         # Display prefix results from session state
-        if hasattr(st.session_state, 'prefix_result'):
-            result = st.session_state.prefix_result
+        result = get_result('prefix', (prefix, max_results))
+        if result is not None:
             if "error" not in result and result.get('totalResultsCount', 0) > 0:
                 st.success(f"Found {result['totalResultsCount']} postal codes starting with '{prefix}'")
                 
                 # Create DataFrame
-                df = pd.DataFrame(result['geonames'])
+                df = pd.DataFrame.from_records(result['geonames'], columns=RESULT_COLUMNS)
+                df['lat'] = df['lat'].round(MAP_COORD_DECIMALS)
+                df['lng'] = df['lng'].round(MAP_COORD_DECIMALS)
                 st.dataframe(df, use_container_width=True)
                 
                 # Show map if results exist
                 if len(df) > 0:
                     st.subheader("🗺️ Map View")
-                    fig = px.scatter_mapbox(
-                        df, 
-                        lat="lat", 
-                        lon="lng",
-                        hover_data=["postalCode", "placeName", "state"],
-                        zoom=6,
-                        height=500,
-                        mapbox_style="open-street-map"
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    records = tuple(zip(
+                        df['lat'].tolist(),
+                        df['lng'].tolist(),
+                        df['postalCode'].tolist(),
+                        df['placeName'].tolist(),
+                        df['state'].tolist()
+                    ))
+                    st.plotly_chart(build_prefix_map(records), use_container_width=True)
             else:
                 st.warning("No results found for this prefix.")
 
@@ -231,13 +511,12 @@ elif selected_tool == "🌍 Geocode Postal Code":
             tool_args = {"postalCode": postal_code}
             if style != "MEDIUM":
                 tool_args["style"] = style
-            result = run_async(call_mcp_tool("geocode_postal", tool_args))
-            st.session_state.geocode_result = result
-            st.session_state.geocode_postal_code = postal_code
+            result = call_tool_cached("geocode_postal", tool_args)
+            store_result('geocode', (postal_code, style), result)
     
     # Display geocode results from session state
-    if hasattr(st.session_state, 'geocode_result'):
-        result = st.session_state.geocode_result
+    result = get_result('geocode', (postal_code, style))
+    if result is not None:
         if "error" not in result and result.get('totalResultsCount', 0) > 0:
             record = result['geonames'][0]
             
@@ -255,15 +534,19 @@ elif selected_tool == "🌍 Geocode Postal Code":
             
             with col2:
                 st.subheader("🗺️ Location Map")
-                m = folium.Map(location=[record['lat'], record['lng']], zoom_start=10)
-                folium.Marker(
-                    [record['lat'], record['lng']],
-                    popup=f"{record['placeName']}, {record['state']} {record['postalCode']}",
-                    tooltip=f"ZIP {record['postalCode']}"
-                ).add_to(m)
-                st_folium(m, height=300, width=400)
+                map_html = get_rendered_html(
+                    "geocode_map",
+                    build_single_marker_map_html,
+                    record['lat'],
+                    record['lng'],
+                    f"{record['placeName']}, {record['state']} {record['postalCode']}",
+                    f"ZIP {record['postalCode']}",
+                    zoom=10
+                )
+                components.html(map_html, height=300, width=400)
             
-            st.json(result)
+            with st.expander("Show raw JSON response"):
+                st.json(result)
         else:
             st.error("Postal code not found or invalid.")
 
@@ -272,101 +555,72 @@ elif selected_tool == "📍 Reverse Geocoding":
     st.header("📍 Reverse Geocoding")
     st.markdown("Find postal codes near geographic coordinates.")
     
+    st.session_state.setdefault('reverse_lat', 47.606)
+    st.session_state.setdefault('reverse_lng', -122.332)
+    
     col1, col2 = st.columns(2)
     with col1:
-        latitude = st.number_input("Latitude:", value=47.606, format="%.6f", step=0.000001)
+        latitude = st.number_input("Latitude:", key='reverse_lat', format="%.6f", step=0.000001)
         radius = st.slider("Search Radius (km):", 1.0, 50.0, 5.0, 0.1)
     with col2:
-        longitude = st.number_input("Longitude:", value=-122.332, format="%.6f", step=0.000001)
+        longitude = st.number_input("Longitude:", key='reverse_lng', format="%.6f", step=0.000001)
         max_results = st.slider("Maximum Results:", 1, 20, 10)
     
     # Quick location buttons
     st.markdown("**Quick Locations:**")
     location_cols = st.columns(4)
     
-    with location_cols[0]:
-        if st.button("Seattle, WA"):
-            st.session_state.quick_lat = 47.606
-            st.session_state.quick_lng = -122.332
-    with location_cols[1]:
-        if st.button("New York, NY"):
-            st.session_state.quick_lat = 40.7128
-            st.session_state.quick_lng = -74.0060
-    with location_cols[2]:
-        if st.button("Los Angeles, CA"):
-            st.session_state.quick_lat = 34.0522
-            st.session_state.quick_lng = -118.2437
-    with location_cols[3]:
-        if st.button("Chicago, IL"):
-            st.session_state.quick_lat = 41.8781
-            st.session_state.quick_lng = -87.6298
-    
-    # Update coordinates if quick location was selected
-    if hasattr(st.session_state, 'quick_lat'):
-        latitude = st.session_state.quick_lat
-        longitude = st.session_state.quick_lng
-        del st.session_state.quick_lat
-        del st.session_state.quick_lng
+    # Callbacks run before the rerun, so the coordinate inputs pick up the location
+    for column, (label, lat, lng) in zip(location_cols, QUICK_LOCATIONS):
+        with column:
+            st.button(label, on_click=set_reverse_location, args=(lat, lng))
     
     if st.button("Find Nearby Postal Codes", type="primary"):
         with st.spinner("Searching nearby postal codes..."):
-            result = run_async(call_mcp_tool("reverse_geocode", {
+            result = call_tool_cached("reverse_geocode", {
                 "latitude": latitude,
                 "longitude": longitude,
                 "radius": radius,
                 "maxResults": max_results
-            }))
-            st.session_state.reverse_result = result
-            st.session_state.reverse_coords = (latitude, longitude, radius)
+            })
+            store_result('reverse', (latitude, longitude, radius, max_results), result)
     
     # Display reverse geocode results from session state
-    if hasattr(st.session_state, 'reverse_result'):
-        result = st.session_state.reverse_result
+    result = get_result('reverse', (latitude, longitude, radius, max_results))
+    if result is not None:
         if "error" not in result and result.get('totalResultsCount', 0) > 0:
             st.success(f"Found {result['totalResultsCount']} postal codes within {radius}km")
             
             # Create DataFrame
-            df = pd.DataFrame(result['geonames'])
-            df['distance_miles'] = df['distance'] * 0.621371  # Convert km to miles
+            df = pd.DataFrame.from_records(result['geonames'], columns=REVERSE_COLUMNS)
             
-            # Display results table
+            # Display results table (st.dataframe takes the columns as is)
             st.subheader("📋 Nearby Postal Codes")
-            display_df = df[['postalCode', 'placeName', 'state', 'distance', 'distance_miles']].copy()
-            display_df.columns = ['ZIP Code', 'City', 'State', 'Distance (km)', 'Distance (mi)']
-            st.dataframe(display_df, use_container_width=True)
+            dist_km = df['distance'].to_numpy()
+            display_table = {
+                'ZIP Code': df['postalCode'].to_numpy(),
+                'City': df['placeName'].to_numpy(),
+                'State': df['state'].to_numpy(),
+                'Distance (km)': dist_km,
+                'Distance (mi)': dist_km * 0.621371  # Convert km to miles
+            }
+            st.dataframe(display_table, use_container_width=True)
             
             # Map visualization
             st.subheader("🗺️ Map View")
-            m = folium.Map(location=[latitude, longitude], zoom_start=10)
-            
-            # Add search center
-            folium.Marker(
-                [latitude, longitude],
-                popup="Search Center",
-                tooltip="Your Search Location",
-                icon=folium.Icon(color='red', icon='star')
-            ).add_to(m)
-            
-            # Add postal code markers
-            for _, row in df.iterrows():
-                folium.Marker(
-                    [row['lat'], row['lng']],
-                    popup=f"{row['placeName']}, {row['state']} {row['postalCode']}<br>Distance: {row['distance']:.2f} km",
-                    tooltip=f"ZIP {row['postalCode']} ({row['distance']:.2f} km)"
-                ).add_to(m)
+            markers = tuple(zip(
+                df['lat'].tolist(),
+                df['lng'].tolist(),
+                df['placeName'].tolist(),
+                df['state'].tolist(),
+                df['postalCode'].tolist(),
+                df['distance'].tolist()
+            ))
+            map_html = get_rendered_html("reverse_map", build_reverse_map_html, latitude, longitude, radius, markers)
+            components.html(map_html, height=500)
             
-            # Add search radius circle
-            folium.Circle(
-                location=[latitude, longitude],
-                radius=radius * 1000,  # Convert km to meters
-                color='blue',
-                fill=True,
-                fillOpacity=0.1
-            ).add_to(m)
-            
-            st_folium(m, height=500, width=700)
-            
-            st.json(result)
+            with st.expander("Show raw JSON response"):
+                st.json(result)
         else:
             st.warning("No postal codes found in the specified area.")
 
@@ -379,13 +633,12 @@ elif selected_tool == "✅ Validate Postal Code":
     
     if st.button("Validate", type="primary") and postal_code:
         with st.spinner("Validating..."):
-            result = run_async(call_mcp_tool("validate_postal", {"postalCode": postal_code}))
-            st.session_state.validate_result = result
-            st.session_state.validate_postal_code = postal_code
+            result = call_tool_cached("validate_postal", {"postalCode": postal_code})
+            store_result('validate', (postal_code,), result)
     
     # Display validation results from session state
-    if hasattr(st.session_state, 'validate_result'):
-        result = st.session_state.validate_result
+    result = get_result('validate', (postal_code,))
+    if result is not None:
         if "error" not in result:
             if result.get('valid', False):
                 st.success(f"✅ Postal code {postal_code} is **VALID**")
@@ -393,7 +646,8 @@ elif selected_tool == "✅ Validate Postal Code":
             else:
                 st.error(f"❌ Postal code {postal_code} is **INVALID** or not found in database")
             
-            st.json(result)
+            with st.expander("Show raw JSON response"):
+                st.json(result)
         else:
             st.error(f"Error: {result['error']}")
 
@@ -0,0 +1,104 @@
+"""Shared fixtures: a small postal database built like the shipped one."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from mcp_postal_geocoder.server.database.build import build_indexes
+from mcp_postal_geocoder.server.database.connection import DatabaseConnection
+from mcp_postal_geocoder.server.database.queries import PostalQueries
+
+# Same columns and base indexes as data/postal_census_complete.db
+_SCHEMA = (
+    """
+    CREATE TABLE postal_codes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        zcta_code TEXT NOT NULL,
+        zip TEXT,
+        postal_code TEXT,
+        latitude REAL,
+        longitude REAL,
+        country_code TEXT,
+        state TEXT,
+        land_area_sqm REAL,
+        water_area_sqm REAL,
+        city TEXT
+    )
+    """,
+    "CREATE INDEX idx_zcta_lookup ON postal_codes(zcta_code)",
+    "CREATE INDEX idx_coordinates ON postal_codes(latitude, longitude)",
+    "CREATE INDEX idx_state ON postal_codes(state)",
+)
+
+# Real postal codes around Seattle and Los Angeles
+KNOWN_ROWS = [
+    ("98101", 47.6105, -122.3339, "WA", "Seattle"),
+    ("98104", 47.6022, -122.3263, "WA", "Seattle"),
+    ("98109", 47.6303, -122.3467, "WA", "Seattle"),
+    ("98121", 47.6151, -122.3447, "WA", "Seattle"),
+    ("98004", 47.6185, -122.2056, "WA", "Bellevue"),
+    ("98052", 47.6815, -122.1208, "WA", "Redmond"),
+    ("90210", 34.0901, -118.4065, "CA", "Beverly Hills"),
+    ("90024", 34.0635, -118.4455, "CA", "Los Angeles"),
+]
+
+
+def _grid_rows():
+    """A regular grid of synthetic postal codes across the contiguous US."""
+    code = 10000
+    for i in range(25):
+        for j in range(58):
+            code += 1
+            yield (f"{code:05d}", 25.0 + i, -124.0 + j, "TX", f"City {code}")
+
+
+def make_postal_db(path: Path) -> Path:
+    """Create an unindexed postal database like a fresh download."""
+    conn = sqlite3.connect(path)
+    try:
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.executemany(
+            """
+            INSERT INTO postal_codes
+                (zcta_code, zip, postal_code, latitude, longitude, country_code, state,
+                 land_area_sqm, water_area_sqm, city)
+            VALUES (?, ?, ?, ?, ?, 'US', ?, 1000000.0, 0.0, ?)
+            """,
+            ((code, code, code, lat, lng, state, city)
+             for code, lat, lng, state, city in [*KNOWN_ROWS, *_grid_rows()])
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture
+def postal_db(tmp_path: Path) -> Path:
+    """Path to a fixture database with every build step applied."""
+    path = make_postal_db(tmp_path / "postal.db")
+    conn = sqlite3.connect(path)
+    try:
+        build_indexes(conn)
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture
+def database(postal_db: Path, monkeypatch: pytest.MonkeyPatch):
+    """A connection pool over the fixture database."""
+    db = DatabaseConnection(pool_size=2)
+    monkeypatch.setattr(db, "_get_database_path", lambda: postal_db)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def queries(database: DatabaseConnection) -> PostalQueries:
+    """Query layer reading from the fixture pool."""
+    postal_queries = PostalQueries()
+    postal_queries.db_conn = database
+    return postal_queries
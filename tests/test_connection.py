@@ -0,0 +1,89 @@
+"""Tests for the database connection pool."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from mcp_postal_geocoder.server.database.connection import DatabaseConnection
+
+
+def test_acquire_opens_pool(database: DatabaseConnection):
+    with database.acquire() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM postal_codes").fetchone()[0] > 0
+    assert database.has_geohash_index
+
+
+def test_connections_are_read_only(database: DatabaseConnection):
+    with database.acquire() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM postal_codes")
+
+
+def test_connection_returned_to_pool(database: DatabaseConnection):
+    with database.acquire() as first:
+        pass
+    with database.acquire() as a, database.acquire() as b:
+        assert first in (a, b)
+        assert a is not b
+
+
+class _SignallingQueue:
+    """Pool queue that counts the threads that have started waiting."""
+
+    def __init__(self, pool) -> None:
+        self._pool = pool
+        self.waiting = threading.Semaphore(0)
+
+    def get(self, *args, **kwargs):
+        self.waiting.release()
+        return self._pool.get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+
+def test_close_wakes_waiting_threads(database: DatabaseConnection):
+    database.connect()
+    errors = []
+
+    def wait_for_connection():
+        try:
+            with database.acquire():
+                pass
+        except sqlite3.ProgrammingError as e:
+            errors.append(e)
+
+    # Both connections are checked out, so the threads block in acquire()
+    with database.acquire(), database.acquire():
+        pool = database._pool = _SignallingQueue(database._pool)
+        threads = [threading.Thread(target=wait_for_connection) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for _ in threads:
+            assert pool.waiting.acquire(timeout=5)
+        database.close()
+        for thread in threads:
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
+    assert len(errors) == 3
+
+
+def test_reopens_after_close(database: DatabaseConnection):
+    with database.acquire() as conn:
+        pass
+    database.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+    with database.acquire() as conn:
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_close_runs_hooks(database: DatabaseConnection, monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    monkeypatch.setattr(DatabaseConnection, "_close_hooks", [lambda: calls.append(True)])
+    database.connect()
+    database.close()
+    assert calls == [True]
@@ -0,0 +1,58 @@
+"""Tests for the 32-bit geohash used by the geohash scan fallback."""
+
+import random
+
+import pytest
+
+from mcp_postal_geocoder.server.database.geohash import MAX_CELLS, cell_ranges, geohash32
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def to_base32(code: int) -> str:
+    """The first 6 characters (30 bits) of the standard geohash string."""
+    top = code >> 2
+    return "".join(_BASE32[(top >> (5 * (5 - i))) & 31] for i in range(6))
+
+
+def test_corners():
+    assert geohash32(-90.0, -180.0) == 0
+    assert geohash32(90.0, 180.0) == 0xFFFFFFFF
+    # Longitude is the first interleaved bit, latitude the second
+    assert geohash32(0.0, 0.0) == 0xC0000000
+
+
+@pytest.mark.parametrize("lat, lng, expected", [
+    (47.6062, -122.3321, "c23nb6"),  # Seattle
+    (34.0901, -118.4065, "9q5cct"),  # Beverly Hills
+    (40.7128, -74.0060, "dr5reg"),   # New York
+])
+def test_matches_standard_geohash(lat: float, lng: float, expected: str):
+    assert to_base32(geohash32(lat, lng)) == expected
+
+
+def test_cell_ranges_are_sorted_and_disjoint():
+    ranges = cell_ranges(47.5, 47.7, -122.5, -122.2)
+    assert 1 <= len(ranges) <= MAX_CELLS
+    for start, end in ranges:
+        assert start < end
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        # Touching ranges would have been merged
+        assert end < start
+
+
+@pytest.mark.parametrize("box", [
+    (47.5, 47.7, -122.5, -122.2),
+    (-0.1, 0.1, -0.1, 0.1),  # straddles both quadrant boundaries
+    (33.0, 35.0, -119.5, -117.0),
+    (89.0, 90.0, 179.0, 180.0),
+])
+def test_cell_ranges_cover_box(box):
+    min_lat, max_lat, min_lng, max_lng = box
+    ranges = cell_ranges(min_lat, max_lat, min_lng, max_lng)
+    rng = random.Random(0)
+    points = [(min_lat, min_lng), (min_lat, max_lng), (max_lat, min_lng), (max_lat, max_lng)]
+    points += [(rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)) for _ in range(500)]
+    for lat, lng in points:
+        code = geohash32(lat, lng)
+        assert any(start <= code < end for start, end in ranges), (lat, lng)
@@ -0,0 +1,52 @@
+"""Every hot statement must be answered from an index, never a table scan."""
+
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from mcp_postal_geocoder.server.database import queries  # noqa: F401  (registers the statements)
+from mcp_postal_geocoder.server.database.connection import DatabaseConnection
+
+
+def query_plan(conn: sqlite3.Connection, query: str) -> List[str]:
+    """Detail lines of EXPLAIN QUERY PLAN for ``query``."""
+    params = (1,) * query.count("?")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+@pytest.fixture
+def conn(postal_db: Path):
+    connection = sqlite3.connect(postal_db)
+    yield connection
+    connection.close()
+
+
+def test_statements_are_registered():
+    names = set(DatabaseConnection._prepared)
+    assert {"find_by_code", "prefix", "search_by_code", "near", "near_rtree", "validate"} <= names
+    assert "near_geohash_1" in names
+
+
+@pytest.mark.parametrize("name", sorted(DatabaseConnection._prepared))
+def test_statement_uses_index(conn: sqlite3.Connection, name: str):
+    try:
+        plan = query_plan(conn, DatabaseConnection._prepared[name])
+    except sqlite3.OperationalError as e:
+        pytest.skip(f"not available in this SQLite build: {e}")
+
+    # The only full scan allowed is the R*Tree's own virtual table lookup
+    scans = [line for line in plan if line.startswith("SCAN") and "VIRTUAL TABLE" not in line]
+    assert not scans, f"{name} scans a table: {plan}"
+    assert any(line.startswith("SEARCH") or "VIRTUAL TABLE" in line for line in plan), plan
+
+
+def test_exact_lookup_uses_covering_index(conn: sqlite3.Connection):
+    plan = query_plan(conn, DatabaseConnection._prepared["find_by_code"])
+    assert any("COVERING INDEX" in line for line in plan), plan
+
+
+def test_prefix_lookup_needs_no_sort(conn: sqlite3.Connection):
+    plan = query_plan(conn, DatabaseConnection._prepared["prefix"])
+    assert not any("TEMP B-TREE" in line for line in plan), plan
@@ -0,0 +1,103 @@
+"""Tests for haversine filtering and ranking in reverse geocoding."""
+
+import math
+
+import msgspec
+import numpy as np
+import pytest
+
+from mcp_postal_geocoder.server.database.models import ReverseGeocodeInput
+from mcp_postal_geocoder.server.database.queries import (
+    EARTH_RADIUS_KM,
+    KM_PER_DEGREE,
+    PostalQueries,
+    haversine_distance_np,
+    haversine_term_limit,
+    haversine_term_np,
+)
+
+from .conftest import KNOWN_ROWS
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Reference great-circle distance."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def reverse(queries: PostalQueries, lat: float, lng: float, radius: float, max_results: int = 100):
+    params = msgspec.convert(
+        {"latitude": lat, "longitude": lng, "radius": radius, "maxResults": max_results},
+        ReverseGeocodeInput
+    )
+    return queries.find_near_coordinates(params)
+
+
+def test_haversine_helpers_match_reference():
+    lats = np.array([47.6105, 34.0901, 0.0, -33.8688])
+    lngs = np.array([-122.3339, -118.4065, 0.0, 151.2093])
+    distances = haversine_distance_np(haversine_term_np(47.6022, -122.3263, lats, lngs))
+    for lat, lng, distance in zip(lats, lngs, distances):
+        assert distance == pytest.approx(haversine_km(47.6022, -122.3263, lat, lng), rel=1e-9)
+
+
+def test_term_limit_is_distance_at_radius():
+    # One degree of latitude along a meridian is exactly KM_PER_DEGREE
+    term = haversine_term_np(10.0, 20.0, np.array([11.0]), np.array([20.0]))[0]
+    assert term == pytest.approx(haversine_term_limit(KM_PER_DEGREE), rel=1e-9)
+
+
+@pytest.fixture(params=["spatial", "geohash", "bounding box"])
+def index_queries(request, queries: PostalQueries) -> PostalQueries:
+    """The query layer forced onto each candidate query path."""
+    database = queries.db_conn
+    database.connect()
+    if request.param == "spatial" and not database.has_spatial_index:
+        pytest.skip("SQLite built without R*Tree")
+    database.has_spatial_index = request.param == "spatial"
+    database.has_geohash_index = request.param in ("spatial", "geohash")
+    return queries
+
+
+@pytest.mark.parametrize("lat, lng, radius", [
+    (47.6062, -122.3321, 5.0),
+    (47.6062, -122.3321, 20.0),
+    (34.07, -118.42, 10.0),
+    (40.0, -100.0, 100.0),
+])
+def test_matches_brute_force(index_queries: PostalQueries, lat: float, lng: float, radius: float):
+    expected = sorted(
+        (haversine_km(lat, lng, row_lat, row_lng), code)
+        for code, row_lat, row_lng, _, _ in KNOWN_ROWS
+        if haversine_km(lat, lng, row_lat, row_lng) <= radius
+    )
+    results = reverse(index_queries, lat, lng, radius)
+    # The synthetic grid lies on whole degrees; keep only the known rows
+    results = [(distance, row["zcta_code"]) for row, distance in results
+               if row["zcta_code"] in {known[0] for known in KNOWN_ROWS}]
+
+    assert [code for _, code in results] == [code for _, code in expected]
+    for (distance, _), (reference, _) in zip(results, expected):
+        assert distance == pytest.approx(reference, rel=1e-9)
+
+
+def test_grid_points_within_radius(index_queries: PostalQueries):
+    # Grid points are one degree apart: about 85 km along the parallel and
+    # 111 km along the meridian at this latitude
+    results = reverse(index_queries, 40.0, -100.0, 100.0)
+    grid = [(row["latitude"], row["longitude"]) for row, _ in results]
+    assert sorted(grid) == [(40.0, -101.0), (40.0, -100.0), (40.0, -99.0)]
+
+
+def test_results_are_nearest_first_and_limited(index_queries: PostalQueries):
+    results = reverse(index_queries, 47.6062, -122.3321, 20.0, max_results=3)
+    assert [row["zcta_code"] for row, _ in results] == ["98101", "98104", "98121"]
+    distances = [distance for _, distance in results]
+    assert distances == sorted(distances)
+
+
+def test_no_results(index_queries: PostalQueries):
+    assert reverse(index_queries, 0.0, 0.0, 10.0) == []